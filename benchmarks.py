@@ -0,0 +1,326 @@
+"""
+--------------------------------------------------------------------------
+Benchmarks - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Benchmarks
+
+  Benchmark suite for the lightsaber hot paths.  Everything runs against the
+simulated hardware backend (hal_sim.py), so it works on any Linux host:
+
+    dotstar_show_<N>[_numpy]  : DotStar set_pixels + show, frames / s
+    flicker_fps[_numpy]       : Animations.flicker, frames / s
+    light_up_ratio            : light_up wall time / nominal time
+    light_down_ratio          : light_down wall time / nominal time
+    mpu_read_us               : MPU6050.get_sensor_data (sim bus), us / call
+    mpu_decode_us             : MPU6050.decode_sample only, us / call
+    lightsaber_cpu_pct        : lightsaber.py run with the blade on, CPU %
+
+  Results are printed (or written with --output) as JSON.  With --baseline,
+each result is compared to a previous run and any result that got worse by 
+more than --tolerance (fraction, default 0.10) is reported as a regression 
+and the script exits with status 1.
+
+Usage:
+
+  python3 benchmarks.py [--quick] [--output FILE] [--baseline FILE] 
+                        [--tolerance 0.10] [--only NAME ...]
+
+  --only runs the benchmarks whose result names (above) start with one of
+  the given prefixes, e.g. --only mpu_read_us or --only dotstar_show.
+
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import platform
+import subprocess
+
+# The benchmarks always run on the simulated hardware
+os.environ.setdefault("LIGHTSABER_BACKEND", "sim")
+
+import hal
+hal.select_backend("sim")
+
+from sLED_DotStar import DotStar, np
+from sLED_Animations import Animations
+from mpu6050_class import MPU6050
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HERE                = os.path.dirname(os.path.abspath(__file__))
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def result(value, unit, higher_is_better):
+    """ One benchmark result """
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+# End def
+
+
+def timed_loop(function, min_time):
+    """ Run function until min_time has passed, return calls / s """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+# End def
+
+
+def bench_dotstar_show(num_leds, use_numpy, min_time):
+    """ Encode + send a new frame of random pixels every call """
+    strip  = DotStar(num_leds, brightness=0.8, use_numpy=use_numpy)
+    frames = []
+    for i in range(8):
+        pixels = [(random.randrange(256), random.randrange(256), random.randrange(256))
+                  for n in range(num_leds)]
+        frames.append(np.array(pixels, dtype=np.uint8) if use_numpy else pixels)
+
+    state = [0]
+    def frame():
+        strip.set_pixels(frames[state[0] & 7])
+        strip.show()
+        state[0] += 1
+
+    return result(timed_loop(frame, min_time), "frames/s", True)
+
+# End def
+
+
+def bench_flicker(use_numpy, frames):
+    """ Animations.flicker with no sleep between frames """
+    strip      = DotStar(108, brightness=0.8, use_numpy=use_numpy)
+    animations = Animations(strip, [False])
+    animations.get_flicker_noise(30).build()   # Bank is built once, not per frame
+    remaining  = [frames]
+
+    def is_active():
+        remaining[0] -= 1
+        return remaining[0] >= 0
+
+    start = time.perf_counter()
+    animations.flicker(base_color=lambda: (0, 0, 255), speed=0, is_active_func=is_active)
+    return result(frames / (time.perf_counter() - start), "frames/s", True)
+
+# End def
+
+
+def bench_light(effect, speed):
+    """ Wall time of light_up / light_down relative to steps * speed """
+    strip      = DotStar(108, brightness=0.8)
+    animations = Animations(strip, [False])
+    steps      = (108 + 1) // 2 if effect == "light_up" else 108 // 2 + 1
+    run        = getattr(animations, effect)
+
+    start = time.perf_counter()
+    run(base_color=lambda: (0, 0, 255), speed=speed)
+    return result((time.perf_counter() - start) / (steps * speed), "ratio", False)
+
+# End def
+
+
+def bench_mpu(min_time):
+    """ Full sensor read on the simulated bus, and the decode alone """
+    mpu = MPU6050()
+    raw = mpu.read_raw_sample()
+
+    read   = timed_loop(mpu.get_sensor_data, min_time)
+    decode = timed_loop(lambda: MPU6050.decode_sample(raw), min_time)
+    mpu.close()
+    return {
+        "mpu_read_us"   : result(1e6 / read, "us/call", False),
+        "mpu_decode_us" : result(1e6 / decode, "us/call", False),
+    }
+
+# End def
+
+
+def bench_lightsaber(duration):
+    """ CPU use of lightsaber.py with the blade ignited on the simulator """
+    env = dict(os.environ)
+    env["LIGHTSABER_BACKEND"] = "sim"
+    env["LIGHTSABER_SIM_GPIO"] = "P2_19:0.2=0,2.4=1"   # Long press -> ignite
+
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, "lightsaber.py")],
+                               cwd=HERE, env=env, stdout=subprocess.DEVNULL)
+    start = time.monotonic()
+    time.sleep(duration)
+    process.send_signal(signal.SIGINT)
+    pid, status, usage = os.wait4(process.pid, 0)
+    wall = time.monotonic() - start
+
+    cpu = usage.ru_utime + usage.ru_stime
+    return result(100.0 * cpu / wall, "%", False)
+
+# End def
+
+
+def benchmark_cases(quick=False):
+    """ Return {case: (result names, function)} for every benchmark """
+    min_time = 0.2 if quick else 1.0
+    cases    = {}
+
+    for num_leds in (108, 1000, 10000):
+        cases["dotstar_show_{0}".format(num_leds)] = lambda n=num_leds: bench_dotstar_show(n, False, min_time)
+        if np is not None:
+            cases["dotstar_show_{0}_numpy".format(num_leds)] = lambda n=num_leds: bench_dotstar_show(n, True, min_time)
+
+    flicker_frames = 300 if quick else 2000
+    cases["flicker_fps"] = lambda: bench_flicker(False, flicker_frames)
+    if np is not None:
+        cases["flicker_fps_numpy"] = lambda: bench_flicker(True, flicker_frames)
+
+    cases["light_up_ratio"]     = lambda: bench_light("light_up", 0.002)
+    cases["light_down_ratio"]   = lambda: bench_light("light_down", 0.002)
+    cases["mpu"]                = lambda: bench_mpu(min_time)
+    cases["lightsaber_cpu_pct"] = lambda: bench_lightsaber(4.0 if quick else 10.0)
+
+    # Cases named after their only result, except those with several
+    names = {"mpu": ("mpu_read_us", "mpu_decode_us")}
+    return {name: (names.get(name, (name,)), case) for name, case in cases.items()}
+
+# End def
+
+
+def benchmark_names():
+    """ Every result name a full run reports """
+    return [name for names, case in benchmark_cases().values() for name in names]
+
+# End def
+
+
+def run_benchmarks(quick=False, only=None):
+    """ Run every benchmark (or those whose results start with only), return the results """
+    def wanted(name):
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    results = {}
+    for name, (names, case) in benchmark_cases(quick).items():
+        if not any(wanted(result_name) for result_name in names):
+            continue
+        value = case()
+        if "value" in value:
+            value = {name: value}
+        results.update((key, result) for key, result in value.items() if wanted(key))
+    return results
+
+# End def
+
+
+def compare(results, baseline, tolerance):
+    """ Return a list of regressions against a baseline run """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or not previous["value"]:
+            continue
+
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse  = -change if current["higher_is_better"] else change
+        current["baseline"] = previous["value"]
+        current["change"]   = change
+        if worse > tolerance:
+            regressions.append("{0}: {1:.4g} -> {2:.4g} {3} ({4:+.1%})".format(
+                name, previous["value"], current["value"], current["unit"], change))
+    return regressions
+
+# End def
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lightsaber benchmarks (simulated hardware)",
+                                     epilog="benchmarks: " + ", ".join(benchmark_names()))
+    parser.add_argument("--quick", action="store_true", help="shorter runs")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (fraction)")
+    parser.add_argument("--only", nargs="+", help="only run benchmarks whose names start with these (listed below)")
+    args = parser.parse_args(argv)
+
+    for prefix in args.only or ():
+        if not any(name.startswith(prefix) for name in benchmark_names()):
+            parser.error("no benchmark starts with {0!r}".format(prefix))
+
+    report = {
+        "meta": {
+            "time"      : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python"    : platform.python_version(),
+            "machine"   : platform.machine(),
+            "numpy"     : np.__version__ if np is not None else None,
+        },
+        "results": run_benchmarks(args.quick, args.only),
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    for line in regressions:
+        print("REGRESSION " + line, file=sys.stderr)
+    return 1 if regressions else 0
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+--------------------------------------------------------------------------
+Frame Scheduler - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Frame Scheduler
+
+  Deadline based timing for animations and render loops.  Deadlines are laid
+out on a fixed grid from a monotonic clock (start + k * period), so the time 
+spent encoding a frame and sending it over SPI is absorbed by the sleep instead
+of being added on top of it.  When a frame runs past its deadline the overrun
+is recorded and, if whole periods were missed, those deadlines are skipped 
+rather than rendered back to back.
+
+Software API:
+
+  FrameScheduler(period)
+    - Provide the time (in seconds) between frames
+    
+    start()
+      - Start the clock (frame 0 is due now) and clear the counters
+
+    resync()
+      - Lay the deadlines out from now again (e.g. after an idle wait) 
+        and keep the counters, so the idle time is not an overrun
+
+    elapsed()
+      - Return seconds since start()
+
+    step()
+      - Return the index of the period the clock is in (int(elapsed / period))
+      - Animations use this to jump to the step that is due when behind
+
+    wait()
+      - Sleep until the next deadline, return the overrun (in seconds) of
+        the frame that just finished (0.0 if it was on time)
+    
+    stats()
+      - Return a dictionary of frame / overrun / skipped counters
+
+"""
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class FrameScheduler():
+    """ Frame Scheduler Class """
+    period                        = None
+    start_time                    = None
+    next_deadline                 = None
+    frames                        = None
+    overruns                      = None
+    skipped                       = None
+    max_overrun                   = None
+    total_overrun                 = None
+    last_overrun                  = None
+    
+    def __init__(self, period):
+        """ Initialize variables """
+        if period <= 0:
+            raise ValueError("FrameScheduler() period must be positive")
+
+        self.period = period
+        self.start()
+    
+    # End def
+
+
+    def start(self):
+        """ Start (or restart) the clock and clear the counters """
+        self.start_time     = time.monotonic()
+        self.next_deadline  = self.start_time + self.period
+        self.frames         = 0
+        self.overruns       = 0
+        self.skipped        = 0
+        self.max_overrun    = 0.0
+        self.total_overrun  = 0.0
+        self.last_overrun   = 0.0
+
+    # End def
+
+
+    def resync(self):
+        """ Restart the deadline grid at now, keep the counters (and start_time) """
+        self.next_deadline  = time.monotonic() + self.period
+
+    # End def
+
+
+    def elapsed(self):
+        """ Return seconds since start() """
+        return time.monotonic() - self.start_time
+
+    # End def
+
+
+    def step(self):
+        """ Return the index of the period the clock is currently in """
+        return int(self.elapsed() / self.period)
+
+    # End def
+
+
+    def wait(self):
+        """ Sleep until the next deadline.
+        
+           Returns:  Overrun (seconds) of the frame that just finished
+        """
+        now     = time.monotonic()
+        overrun = now - self.next_deadline
+
+        self.frames += 1
+        
+        if overrun <= 0:
+            # On time - sleep off the rest of the period
+            time.sleep(-overrun)
+            overrun = 0.0
+        else:
+            self.overruns      += 1
+            self.total_overrun += overrun
+            self.max_overrun    = max(self.max_overrun, overrun)
+
+        self.last_overrun   = overrun
+        self.next_deadline += self.period
+
+        # Skip every deadline that already passed instead of bursting frames
+        if overrun > self.period:
+            missed              = int(overrun / self.period)
+            self.skipped       += missed
+            self.next_deadline += missed * self.period
+
+        return overrun
+
+    # End def
+
+
+    def stats(self):
+        """ Return the frame timing counters """
+        return {
+            "frames"            : self.frames,
+            "overruns"          : self.overruns,
+            "skipped"           : self.skipped,
+            "max_overrun"       : self.max_overrun,
+            "mean_overrun"      : self.total_overrun / self.overruns if self.overruns else 0.0,
+            "elapsed"           : self.elapsed(),
+        }
+
+    # End def
+
+# End class
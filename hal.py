@@ -0,0 +1,172 @@
+"""
+--------------------------------------------------------------------------
+Hardware Abstraction Layer - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Hardware Abstraction Layer
+
+  Every driver gets its hardware modules from here instead of importing 
+spidev, smbus2 or Adafruit_BBIO.GPIO directly:
+
+    from hal import spidev        # instead of: import spidev
+    from hal import smbus2        # instead of: import smbus2
+    from hal import GPIO          # instead of: import Adafruit_BBIO.GPIO as GPIO
+
+  Each name is a small proxy that forwards to the module of the selected 
+backend, so driver code is unchanged:
+
+    "hw"  : the real spidev / smbus2 / Adafruit_BBIO.GPIO modules (default)
+    "sim" : in-process simulated SPI, I2C and GPIO from hal_sim.py, so the
+            drivers and animations can be run and profiled on any Linux box
+
+  The backend comes from the LIGHTSABER_BACKEND environment variable, or 
+select_backend() for code that configures it itself.  Modules are resolved on
+first use, so the hardware modules are never imported in "sim" mode.
+
+Software API:
+
+  select_backend(name)
+    - Select "hw" or "sim" (takes effect for every later hardware call)
+
+  get_backend()
+    - Return the selected backend name
+
+  is_simulated()
+    - Return True when the "sim" backend is selected
+
+"""
+import os
+import importlib
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+BACKEND_ENV     = "LIGHTSABER_BACKEND"
+
+# Backend -> proxy name -> module that provides it
+BACKENDS = {
+    "hw"  : {
+        "spidev"  : "spidev",
+        "smbus2"  : "smbus2",
+        "GPIO"    : "Adafruit_BBIO.GPIO",
+    },
+    "sim" : {
+        "spidev"  : "hal_sim",
+        "smbus2"  : "hal_sim",
+        "GPIO"    : "hal_sim",
+    },
+}
+
+# Attribute of the sim module that stands in for each proxy
+SIM_NAMESPACES = {
+    "spidev"  : "spidev",
+    "smbus2"  : "smbus2",
+    "GPIO"    : "GPIO",
+}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+_backend        = None
+_resolved       = {}
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def select_backend(name):
+    """ Select the "hw" or "sim" backend """
+    global _backend
+    
+    if name not in BACKENDS:
+        raise ValueError("Unknown hardware backend: {0}".format(name))
+
+    _backend = name
+    _resolved.clear()
+
+# End def
+
+
+def get_backend():
+    """ Return the selected backend name """
+    return _backend
+
+# End def
+
+
+def is_simulated():
+    """ Return True when running on the simulated backend """
+    return _backend == "sim"
+
+# End def
+
+
+def _resolve(proxy_name):
+    """ Return the backend module behind a proxy (imported on first use) """
+    module = _resolved.get(proxy_name)
+    if module is None:
+        module = importlib.import_module(BACKENDS[_backend][proxy_name])
+        if _backend == "sim":
+            module = getattr(module, SIM_NAMESPACES[proxy_name])
+        _resolved[proxy_name] = module
+    return module
+
+# End def
+
+
+class _ModuleProxy():
+    """ Forwards attribute access to the selected backend's module """
+    
+    def __init__(self, proxy_name):
+        self._proxy_name = proxy_name
+
+    # End def
+
+    def __getattr__(self, attr):
+        return getattr(_resolve(self._proxy_name), attr)
+
+    # End def
+
+    def __repr__(self):
+        return "<hal {0} ({1})>".format(self._proxy_name, _backend)
+
+    # End def
+
+# End class
+
+
+spidev  = _ModuleProxy("spidev")
+smbus2  = _ModuleProxy("smbus2")
+GPIO    = _ModuleProxy("GPIO")
+
+select_backend(os.environ.get(BACKEND_ENV, "hw"))
@@ -0,0 +1,679 @@
+"""
+--------------------------------------------------------------------------
+Simulated Hardware - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Simulated Hardware
+
+  In-process stand-ins for spidev, smbus2 and Adafruit_BBIO.GPIO, selected 
+with LIGHTSABER_BACKEND=sim (see hal.py).  They implement the calls the 
+lightsaber drivers use, so the real driver code paths can be run and 
+profiled off the PocketBeagle.
+
+  SPI   : SimSpiDev records every frame written as (timestamp, bytes) and 
+          counts transfers / bytes.  Like spidev, xfer2() and writebytes() 
+          refuse messages larger than bufsiz and writebytes2() splits them.
+          With simulate_timing=True each transfer sleeps for the time the 
+          frame takes on the wire at max_speed_hz.
+  
+  I2C   : SimSMBus talks to simulated devices.  The MPU6050 at 0x68 has a 
+          register file, plays a scripted or recorded trace of raw
+          (accel xyz, temp, gyro xyz) samples through the data registers and
+          the FIFO, and raises the motion interrupt at scripted times.  In
+          sleep / cycle mode the data registers hold their value between
+          wake-ups and gyros in standby read 0.
+  
+  GPIO  : SimGPIO keeps pin levels, records outputs and plays scripted edges
+          (input() and wait_for_edge() see them at the scripted times).
+
+  Environment variables:
+
+    LIGHTSABER_SIM_SPI_TIMING=1
+      - Sleep for the wire time of each SPI transfer
+    
+    LIGHTSABER_SIM_GPIO="P2_19:0.5=0,3.0=1;P2_17:..."
+      - Scripted edges per pin as seconds_from_start=level
+      - The example holds the button on P2_19 from 0.5 s to 3.0 s
+
+    LIGHTSABER_SIM_TRACE=FILE
+      - The MPU6050 plays a recording made with imu_trace.py (looped; 
+        the recorded interrupts fire on the first pass only)
+
+    LIGHTSABER_SIM_INT_PIN=PIN
+      - Wire the MPU6050 INT line to a SimGPIO input (e.g. set
+        int_gpio_pin in lightsaber.py to the same pin): it goes high at 
+        each motion interrupt and low when INT_STATUS is read
+
+Software API:
+
+  spidev.SpiDev, smbus2.SMBus, smbus2.i2c_msg, GPIO
+    - Drop-in replacements used through hal.py
+
+  spi_devices
+    - Dictionary of open SimSpiDev objects by (bus, device)
+
+  get_i2c_device(bus_number, address)
+    - Return the simulated device (e.g. SimMPU6050) behind an address
+
+  SimMPU6050.load_trace(samples, rate_hz=1000, loop=True, int_events=())
+    - Play raw 7-tuples at rate_hz; int_events are seconds from now at 
+      which the motion interrupt fires
+
+  SimMPU6050.load_recording(path, loop=True)
+    - Play a trace file recorded with imu_trace.py
+
+  SimMPU6050.connect_int(gpio, pin)
+    - Drive a GPIO input from the latched motion interrupt (INT line)
+
+  GPIO.script(pin, edges)
+    - edges is a list of (seconds_from_now, level)
+
+  GPIO.set_level(pin, level)
+    - Set the level a pin reads immediately
+
+"""
+import os
+import time
+import errno
+import struct
+import threading
+import collections
+import types
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH                = 1
+LOW                 = 0
+
+SPI_BUFSIZ          = 4096    # spidev default bufsiz
+FRAME_HISTORY       = 1024    # SPI frames kept per device
+
+MPU6050_ADDR        = 0x68
+REST_SAMPLE         = (0, 0, 16384, 0, 0, 0, 0)    # Flat, 1 g on z, no rotation
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+spi_devices         = {}
+i2c_devices         = {}      # bus number -> {address: device}
+_i2c_lock           = threading.Lock()
+
+# ------------------------------------------------------------------------
+# SPI
+# ------------------------------------------------------------------------
+
+class SimSpiDev():
+    """ Simulated spidev.SpiDev """
+    
+    def __init__(self):
+        self.bus             = None
+        self.device          = None
+        self.max_speed_hz    = 500000
+        self.mode            = 0
+        self.bits_per_word   = 8
+        self.bufsiz          = SPI_BUFSIZ
+        self.simulate_timing = os.environ.get("LIGHTSABER_SIM_SPI_TIMING") == "1"
+
+        self.frames          = collections.deque(maxlen=FRAME_HISTORY)
+        self.transfers       = 0
+        self.bytes           = 0
+        self.closed          = True
+
+    # End def
+
+    def open(self, bus, device):
+        self.bus    = bus
+        self.device = device
+        self.closed = False
+        spi_devices[(bus, device)] = self
+
+    # End def
+
+    def close(self):
+        self.closed = True
+
+    # End def
+
+    def _transfer(self, data):
+        """ One ioctl worth of data """
+        if self.closed:
+            raise OSError(errno.EBADF, "SPI device not open")
+        
+        self.transfers += 1
+        self.bytes     += len(data)
+        if self.simulate_timing:
+            time.sleep(len(data) * 8.0 / self.max_speed_hz)
+
+    # End def
+
+    def _check_size(self, data):
+        if len(data) > self.bufsiz:
+            raise OSError(errno.EMSGSIZE, "Message too long")
+
+    # End def
+
+    def writebytes(self, data):
+        self._check_size(data)
+        data = bytes(data)
+        self._transfer(data)
+        self.frames.append((time.monotonic(), data))
+
+    # End def
+
+    def writebytes2(self, data):
+        # Like spidev: any buffer, split into bufsiz sized transfers
+        data = bytes(data)
+        for i in range(0, len(data), self.bufsiz):
+            self._transfer(data[i:i + self.bufsiz])
+        self.frames.append((time.monotonic(), data))
+
+    # End def
+
+    def xfer2(self, data):
+        self.writebytes(data)
+        return [0] * len(data)
+
+    # End def
+
+    def xfer3(self, data):
+        self.writebytes2(data)
+        return (0,) * len(data)
+
+    # End def
+
+# End class
+
+# ------------------------------------------------------------------------
+# I2C
+# ------------------------------------------------------------------------
+
+class SimI2CDevice():
+    """ Generic register file device """
+    
+    def __init__(self):
+        self.regs = bytearray(256)
+
+    # End def
+
+    def read(self, register, length):
+        return bytes(self.regs[register:register + length])
+
+    # End def
+
+    def write(self, register, data):
+        self.regs[register:register + len(data)] = bytes(data)
+
+    # End def
+
+# End class
+
+
+class SimMPU6050(SimI2CDevice):
+    """ Simulated MPU6050 that plays a trace of raw samples """
+    ACCEL_XOUT_H    = 0x3B
+    DATA_END        = 0x49
+    SMPLRT_DIV      = 0x19
+    FIFO_EN         = 0x23
+    INT_STATUS      = 0x3A
+    USER_CTRL       = 0x6A
+    PWR_MGMT_1      = 0x6B
+    PWR_MGMT_2      = 0x6C
+    FIFO_COUNTH     = 0x72
+    FIFO_R_W        = 0x74
+    WHO_AM_I        = 0x75
+
+    MOT_INT         = 0x40
+    PWR_SLEEP       = 0x40
+    PWR_CYCLE       = 0x20
+    STBY_GYRO       = 0x07
+    LP_WAKE_RATES   = (1.25, 5, 20, 40)
+    FIFO_OFLOW_INT  = 0x10
+    FIFO_SIZE       = 1024
+
+    SAMPLE          = struct.Struct('>7h')
+    FIFO_SAMPLE     = struct.Struct('>6h')
+    
+    def __init__(self):
+        SimI2CDevice.__init__(self)
+        self.regs[self.WHO_AM_I]   = MPU6050_ADDR
+        self.regs[self.PWR_MGMT_1] = 0x40     # Sleep bit set after power on
+        self.clock                 = time.monotonic
+        self.lock                  = threading.Lock()
+        self.int_line              = None     # (SimGPIO, pin) driven by the interrupt
+        self.load_trace([REST_SAMPLE])
+        self._reset_fifo()
+
+        if os.environ.get("LIGHTSABER_SIM_TRACE"):
+            self.load_recording(os.environ["LIGHTSABER_SIM_TRACE"])
+        if os.environ.get("LIGHTSABER_SIM_INT_PIN"):
+            self.connect_int(GPIO, os.environ["LIGHTSABER_SIM_INT_PIN"])
+
+    # End def
+
+    def load_trace(self, samples, rate_hz=1000, loop=True, int_events=()):
+        """ Play raw (ax, ay, az, temp, gx, gy, gz) samples at rate_hz """
+        with self.lock:
+            self.trace       = list(samples) or [REST_SAMPLE]
+            self.trace_rate  = float(rate_hz)
+            self.trace_loop  = loop
+            self.trace_start = self.clock()
+            self.int_times   = collections.deque(sorted(self.trace_start + t for t in int_events))
+            self.int_status  = 0
+            self._schedule_int_edges()
+
+    # End def
+
+    def load_recording(self, path, loop=True):
+        """ Play a trace file recorded with imu_trace.py """
+        from imu_trace import read_trace
+
+        trace = read_trace(path)
+        if not trace.samples:
+            raise ValueError("{0}: trace has no samples".format(path))
+        origin = trace.samples[0][0]
+        self.load_trace([raw for (t, raw) in trace.samples], trace.rate_hz() or 1000, loop,
+                        [t - origin for t in trace.interrupts])
+
+    # End def
+
+    def _sample_at(self, t):
+        """ Trace sample playing at time t """
+        index = int((t - self.trace_start) * self.trace_rate)
+        if self.trace_loop:
+            index %= len(self.trace)
+        else:
+            index = max(0, min(len(self.trace) - 1, index))
+        return self.trace[index]
+
+    # End def
+
+    def _sample_rate(self):
+        return 1000.0 / (1 + self.regs[self.SMPLRT_DIV])
+
+    # End def
+
+    def _reset_fifo(self):
+        self.fifo           = bytearray()
+        self.fifo_time      = self.clock()
+
+    # End def
+
+    def _fill_fifo(self, now):
+        """ Push the samples taken since the last update into the FIFO """
+        enabled = (self.regs[self.USER_CTRL] & 0x40) and (self.regs[self.FIFO_EN] & 0x78) == 0x78
+        period  = 1.0 / self._sample_rate()
+        
+        if not enabled:
+            self.fifo_time = now
+            return
+
+        while self.fifo_time + period <= now:
+            self.fifo_time += period
+            ax, ay, az, temp, gx, gy, gz = self._sample_at(self.fifo_time)
+            sample = self.FIFO_SAMPLE.pack(ax, ay, az, gx, gy, gz)
+            if len(self.fifo) + len(sample) > self.FIFO_SIZE:
+                # Like the chip, keep writing over the oldest bytes: the FIFO
+                # stays full (1024 bytes, not a whole number of samples)
+                self.int_status |= self.FIFO_OFLOW_INT
+                self.fifo        = (self.fifo + sample)[-self.FIFO_SIZE:]
+                self.fifo_time   = now  # Samples are lost, catch up
+                break
+            self.fifo += sample
+
+    # End def
+
+    def read(self, register, length):
+        with self.lock:
+            now = self.clock()
+            self._fill_fifo(now)
+
+            if register == self.FIFO_R_W:
+                data       = bytes(self.fifo[:length])
+                self.fifo  = self.fifo[length:]
+                return data.ljust(length, b"\x00")
+
+            # Latch the current sample into the data registers
+            self._latch_sample(now)
+
+            # FIFO count registers
+            count = len(self.fifo)
+            self.regs[self.FIFO_COUNTH]     = count >> 8
+            self.regs[self.FIFO_COUNTH + 1] = count & 0xFF
+
+            # Motion interrupt: scripted events become pending in INT_STATUS
+            while self.int_times and self.int_times[0] <= now:
+                self.int_times.popleft()
+                self.int_status |= self.MOT_INT
+            self.regs[self.INT_STATUS] = self.int_status
+
+            data = bytes(self.regs[register:register + length])
+            if register <= self.INT_STATUS < register + length:
+                self.int_status = 0   # Reading INT_STATUS clears it
+                if self.int_line is not None:
+                    gpio, pin = self.int_line
+                    gpio.set_level(pin, LOW)   # ...and releases the latched INT line
+            return data
+
+    # End def
+
+    def _latch_sample(self, now):
+        """ Data registers as the power mode leaves them """
+        power = self.regs[self.PWR_MGMT_1]
+        if power & self.PWR_SLEEP:
+            return    # Asleep - registers hold the last sample
+
+        if power & self.PWR_CYCLE:
+            # One sample per wake-up at the LP_WAKE_CTRL rate
+            rate = self.LP_WAKE_RATES[self.regs[self.PWR_MGMT_2] >> 6]
+            now  = self.trace_start + int((now - self.trace_start) * rate) / rate
+
+        ax, ay, az, temp, gx, gy, gz = self._sample_at(now)
+        if self.regs[self.PWR_MGMT_2] & self.STBY_GYRO == self.STBY_GYRO:
+            gx = gy = gz = 0
+        self.regs[self.ACCEL_XOUT_H:self.DATA_END] = self.SAMPLE.pack(ax, ay, az, temp, gx, gy, gz)
+
+    # End def
+
+    def write(self, register, data):
+        with self.lock:
+            if register == self.INT_STATUS:
+                return    # Read only
+            SimI2CDevice.write(self, register, data)
+            if register <= self.USER_CTRL < register + len(data) and self.regs[self.USER_CTRL] & 0x04:
+                self._reset_fifo()
+                self.regs[self.USER_CTRL] &= ~0x04 & 0xFF
+
+    # End def
+
+    def connect_int(self, gpio, pin):
+        """ Drive a SimGPIO input from the motion interrupt (latched INT line) """
+        with self.lock:
+            self.int_line = (gpio, pin)
+            self._schedule_int_edges()
+
+    # End def
+
+    def _schedule_int_edges(self):
+        """ Rising edges on the INT line at the scripted interrupt times """
+        if self.int_line is None:
+            return
+        gpio, pin = self.int_line
+        with gpio.lock:
+            gpio.edges[pin]  = collections.deque((t, HIGH) for t in self.int_times)
+            gpio.levels[pin] = HIGH if self.int_status & self.MOT_INT else LOW
+            gpio.lock.notify_all()
+
+    # End def
+
+# End class
+
+
+def get_i2c_device(bus_number, address):
+    """ Return the simulated device at an address (created on first use) """
+    with _i2c_lock:
+        devices = i2c_devices.setdefault(bus_number, {})
+        if address not in devices:
+            devices[address] = SimMPU6050() if address == MPU6050_ADDR else SimI2CDevice()
+        return devices[address]
+
+# End def
+
+
+class SimI2CMsg():
+    """ Simulated smbus2.i2c_msg """
+    
+    def __init__(self, address, data, read):
+        self.addr  = address
+        self.buf   = bytearray(data)
+        self.len   = len(self.buf)
+        self.read_ = read
+
+    # End def
+
+    @staticmethod
+    def read(address, length):
+        return SimI2CMsg(address, bytes(length), True)
+
+    # End def
+
+    @staticmethod
+    def write(address, data):
+        return SimI2CMsg(address, data, False)
+
+    # End def
+
+    def __iter__(self):
+        return iter(self.buf)
+
+    # End def
+
+    def __bytes__(self):
+        return bytes(self.buf)
+
+    # End def
+
+    def __len__(self):
+        return self.len
+
+    # End def
+
+# End class
+
+
+class SimSMBus():
+    """ Simulated smbus2.SMBus """
+    
+    def __init__(self, bus=None):
+        self.bus_number   = bus
+        self.transactions = 0
+
+    # End def
+
+    def _device(self, address):
+        self.transactions += 1
+        return get_i2c_device(self.bus_number, address)
+
+    # End def
+
+    def read_byte_data(self, address, register):
+        return self._device(address).read(register, 1)[0]
+
+    # End def
+
+    def write_byte_data(self, address, register, value):
+        self._device(address).write(register, [value])
+
+    # End def
+
+    def read_i2c_block_data(self, address, register, length):
+        return list(self._device(address).read(register, length))
+
+    # End def
+
+    def write_i2c_block_data(self, address, register, data):
+        self._device(address).write(register, data)
+
+    # End def
+
+    def i2c_rdwr(self, *messages):
+        # Register address write followed by reads / writes from it
+        device   = self._device(messages[0].addr)
+        register = None
+        for message in messages:
+            if message.read_:
+                message.buf[:] = device.read(register, message.len)
+            elif register is None:
+                register = message.buf[0]
+                if message.len > 1:
+                    device.write(register, message.buf[1:])
+            else:
+                device.write(register, message.buf)
+
+    # End def
+
+    def close(self):
+        pass
+
+    # End def
+
+# End class
+
+# ------------------------------------------------------------------------
+# GPIO
+# ------------------------------------------------------------------------
+
+class SimGPIO():
+    """ Simulated Adafruit_BBIO.GPIO """
+    HIGH            = HIGH
+    LOW             = LOW
+    IN              = 0
+    OUT             = 1
+    RISING          = 1
+    FALLING         = 2
+    BOTH            = 3
+    PUD_OFF         = 0
+    PUD_DOWN        = 1
+    PUD_UP          = 2
+    
+    def __init__(self):
+        self.default_level = HIGH     # Idle level of unscripted inputs (pull up)
+        self.levels        = {}
+        self.directions    = {}
+        self.outputs       = collections.deque(maxlen=FRAME_HISTORY)  # (time, pin, value)
+        self.edges         = {}       # pin -> deque of (time, level)
+        self.lock          = threading.Condition()
+
+        self._load_env_script(os.environ.get("LIGHTSABER_SIM_GPIO", ""))
+
+    # End def
+
+    def _load_env_script(self, spec):
+        """ "PIN:t=level,t=level;PIN:..." """
+        for entry in filter(None, spec.split(";")):
+            pin, _, events = entry.partition(":")
+            edges = []
+            for event in filter(None, events.split(",")):
+                delay, _, level = event.partition("=")
+                edges.append((float(delay), int(level)))
+            self.script(pin.strip(), edges)
+
+    # End def
+
+    def script(self, pin, edges):
+        """ Schedule (seconds_from_now, level) changes on a pin """
+        now = time.monotonic()
+        with self.lock:
+            queue = self.edges.setdefault(pin, collections.deque())
+            queue.extend((now + delay, level) for delay, level in edges)
+            self.edges[pin] = collections.deque(sorted(queue))
+            self.lock.notify_all()
+
+    # End def
+
+    def set_level(self, pin, level):
+        # Edges already due happened before this change
+        with self.lock:
+            self._apply_edges(pin, time.monotonic())
+            self.levels[pin] = level
+            self.lock.notify_all()
+
+    # End def
+
+    def _apply_edges(self, pin, now):
+        queue = self.edges.get(pin)
+        while queue and queue[0][0] <= now:
+            self.levels[pin] = queue.popleft()[1]
+
+    # End def
+
+    def setup(self, pin, direction, pull_up_down=0, initial=None):
+        with self.lock:
+            self.directions[pin] = direction
+            if initial is not None:
+                self.levels[pin] = initial
+
+    # End def
+
+    def input(self, pin):
+        with self.lock:
+            self._apply_edges(pin, time.monotonic())
+            return self.levels.get(pin, self.default_level)
+
+    # End def
+
+    def output(self, pin, value):
+        with self.lock:
+            self.levels[pin] = value
+            self.outputs.append((time.monotonic(), pin, value))
+
+    # End def
+
+    def wait_for_edge(self, pin, edge, timeout=-1):
+        """ Block until a scripted edge of the right kind (timeout in ms) """
+        deadline = None if timeout is None or timeout < 0 else time.monotonic() + timeout / 1000.0
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                before = self.levels.get(pin, self.default_level)
+                self._apply_edges(pin, now)
+                after = self.levels.get(pin, self.default_level)
+
+                if before != after:
+                    if (edge == self.BOTH or (edge == self.RISING and after == HIGH) or
+                        (edge == self.FALLING and after == LOW)):
+                        return pin
+
+                # Sleep until the next scripted edge, the deadline or a change
+                queue = self.edges.get(pin)
+                wake  = [t for t in (deadline, queue[0][0] if queue else None) if t is not None]
+                if deadline is not None and now >= deadline:
+                    return None
+                self.lock.wait(max(0.0, min(wake) - now) if wake else None)
+
+    # End def
+
+    def cleanup(self):
+        pass
+
+    # End def
+
+# End class
+
+# ------------------------------------------------------------------------
+# Module stand-ins (see hal.py)
+# ------------------------------------------------------------------------
+
+spidev  = types.SimpleNamespace(SpiDev=SimSpiDev)
+smbus2  = types.SimpleNamespace(SMBus=SimSMBus, i2c_msg=SimI2CMsg)
+GPIO    = SimGPIO()
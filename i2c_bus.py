@@ -0,0 +1,271 @@
+"""
+--------------------------------------------------------------------------
+I2C Bus Manager - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+I2C Bus Manager
+
+  Shares one smbus2.SMBus handle per I2C bus between every driver on that 
+bus (e.g. MPU6050 and INT_PIN, which talk to the same chip at 0x68) and 
+serializes their transactions with a lock, so the motion and clash threads 
+cannot interleave on the wire.
+
+  Configuration registers written with write_config() / write_registers() 
+are remembered per device, and writing the value a register already holds is
+skipped.  Consecutive registers in one write_registers() call go out as a 
+single block write.  Transactions, bytes, skipped writes and errors are 
+counted for stats().
+
+Software API:
+
+  I2CBus.get(bus_number)
+    - Return the shared I2CBus for a bus number (opened on first use)
+    - Every get() should be matched by a close()
+
+    acquire()
+      - Take another reference to this bus (e.g. a driver handed a bus
+        with bus=), returns the bus; match it with a close()
+    
+    read_byte_data(address, register)
+    write_byte_data(address, register, value)
+    read_i2c_block_data(address, register, length)
+    write_i2c_block_data(address, register, data)
+    i2c_rdwr(*messages)
+      - Same as smbus2.SMBus, but locked and counted (no caching)
+
+    write_config(address, register, value)
+      - Write a configuration register, skipped if the value is unchanged
+
+    write_registers(address, writes)
+      - Write a list of (register, value) configuration writes while 
+        holding the lock once, batching runs of consecutive registers
+
+    invalidate(address=None)
+      - Forget cached register values (e.g. after a device reset)
+
+    stats()
+      - Return a dictionary of the bus counters
+    
+    close()
+      - Release this user of the bus (closed when the last user is done)
+
+"""
+import threading
+
+from hal import smbus2
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MAX_BLOCK_LEN = 32        # SMBus block transfer limit
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class I2CBus():
+    """ I2C Bus Manager Class """
+    _buses                        = {}
+    _buses_lock                   = threading.Lock()
+    
+    def __init__(self, bus_number):
+        """ Open the bus (use I2CBus.get() to share it) """
+        self.bus_number      = bus_number
+        self.bus             = smbus2.SMBus(bus_number)
+        self.lock            = threading.RLock()
+        self.users           = 0
+
+        self._config         = {}     # (address, register) -> last value written
+
+        self.transactions    = 0
+        self.bytes           = 0
+        self.skipped_writes  = 0
+        self.errors          = 0
+    
+    # End def
+
+
+    @classmethod
+    def get(cls, bus_number):
+        """ Return the shared I2CBus for bus_number """
+        with cls._buses_lock:
+            bus = cls._buses.get(bus_number)
+            if bus is None:
+                bus = cls._buses[bus_number] = cls(bus_number)
+            bus.users += 1
+            return bus
+
+    # End def
+
+
+    def acquire(self):
+        """ Take another reference to this bus """
+        with I2CBus._buses_lock:
+            self.users += 1
+        return self
+
+    # End def
+
+
+    def _call(self, length, function, *args):
+        """ Run one locked, counted transaction """
+        with self.lock:
+            try:
+                result = function(*args)
+            except OSError:
+                self.errors += 1
+                raise
+            self.transactions += 1
+            self.bytes        += length
+            return result
+
+    # End def
+
+
+    def read_byte_data(self, address, register):
+        return self._call(1, self.bus.read_byte_data, address, register)
+
+    # End def
+
+
+    def write_byte_data(self, address, register, value):
+        self._call(1, self.bus.write_byte_data, address, register, value)
+
+    # End def
+
+
+    def read_i2c_block_data(self, address, register, length):
+        return self._call(length, self.bus.read_i2c_block_data, address, register, length)
+
+    # End def
+
+
+    def write_i2c_block_data(self, address, register, data):
+        self._call(len(data), self.bus.write_i2c_block_data, address, register, data)
+
+    # End def
+
+
+    def i2c_rdwr(self, *messages):
+        length = sum(message.len for message in messages)
+        self._call(length, self.bus.i2c_rdwr, *messages)
+
+    # End def
+
+
+    def write_config(self, address, register, value):
+        """ Write a configuration register unless it already holds value """
+        self.write_registers(address, [(register, value)])
+
+    # End def
+
+
+    def write_registers(self, address, writes):
+        """ Write (register, value) pairs under one lock hold.
+        
+            Unchanged registers are skipped and runs of consecutive 
+            registers are sent as one block write.
+        """
+        with self.lock:
+            pending = []
+            for register, value in writes:
+                if self._config.get((address, register)) == value:
+                    self.skipped_writes += 1
+                    continue
+                pending.append((register, value))
+
+            # Group consecutive registers into runs
+            runs = []
+            for register, value in pending:
+                if runs and register == runs[-1][0] + len(runs[-1][1]) and len(runs[-1][1]) < MAX_BLOCK_LEN:
+                    runs[-1][1].append(value)
+                else:
+                    runs.append((register, [value]))
+
+            for register, values in runs:
+                if len(values) == 1:
+                    self.write_byte_data(address, register, values[0])
+                else:
+                    self.write_i2c_block_data(address, register, values)
+
+                for offset, value in enumerate(values):
+                    self._config[(address, register + offset)] = value
+
+    # End def
+
+
+    def invalidate(self, address=None):
+        """ Forget cached configuration values """
+        with self.lock:
+            if address is None:
+                self._config.clear()
+            else:
+                for key in [key for key in self._config if key[0] == address]:
+                    del self._config[key]
+
+    # End def
+
+
+    def stats(self):
+        """ Return the bus counters """
+        return {
+            "bus"               : self.bus_number,
+            "transactions"      : self.transactions,
+            "bytes"             : self.bytes,
+            "skipped_writes"    : self.skipped_writes,
+            "errors"            : self.errors,
+        }
+
+    # End def
+
+
+    def close(self):
+        """ Release one user, close the bus when none are left """
+        with I2CBus._buses_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            if I2CBus._buses.get(self.bus_number) is self:
+                del I2CBus._buses[self.bus_number]
+
+        with self.lock:
+            self.bus.close()
+
+    # End def
+
+# End class
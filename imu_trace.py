@@ -0,0 +1,662 @@
+"""
+--------------------------------------------------------------------------
+IMU Trace - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+IMU Trace
+
+  Record raw MPU6050 samples and motion interrupts to a compact binary file
+and play them back, so motion_threshold / max_history_len / the INT 
+threshold can be tuned (and regressions tested) without swinging the saber.
+
+  File format (little endian): a 16 byte header followed by fixed width 
+records.  The first byte of each record is its type, which also fixes its
+length.  Times are microseconds from the start of the recording (u32, so a 
+single recording can be up to ~71 minutes long).
+
+    HEADER  "LSTR", version u8, flags u8, reserved u16, start time f64 (epoch)
+    SAMPLE  type, time u32, ax ay az temp gx gy gz i16     (19 bytes)
+    DELTA   type, dt u16, 7 x i8 change from last sample   (10 bytes)
+    INT     type, time u32                                 ( 5 bytes)
+    LABEL   type, time u32, label u16                      ( 7 bytes)
+
+  With delta compression (FLAG_DELTA) a sample that is less than 65 ms after
+the previous record and whose values all changed by less than 128 counts is 
+stored as a DELTA record, which roughly halves the size of a recording of 
+a blade at rest.  Anything else is stored as a full SAMPLE record.
+
+  Labels mark what the user was doing from that point on (calm, swing, 
+clash) and are used to score a replay.
+
+Software API:
+
+  TraceWriter(path, delta=True)
+    - Write records to a new file (also a context manager)
+
+    write_sample(raw, t=None) / write_interrupt(t=None) / write_label(label, t=None)
+      - raw is the 7-tuple from MPU6050.read_raw_sample(); t is a 
+        time.monotonic() value (default: now)
+
+    close()
+
+  TraceRecorder(sensor, path, rate_hz=200, int_pin=None, delta=True)
+    - Thread that records sensor.read_raw_sample() at rate_hz and, with an
+      int_pin, the motion interrupts
+
+    label(label)
+      - Mark the current time with a label
+
+    cleanup()
+      - Stop recording and close the file
+
+  read_trace(path)
+    - Return an IMUTrace with events, samples, interrupts and labels
+
+  IMUTrace.as_arrays()
+    - (times, raw) as NumPy arrays (float seconds, (N, 7) int16)
+
+  TraceReplay(trace, speed=1.0, loop=False)
+    - Plays a trace through the MPU6050 (read_raw_sample, get_sensor_data)
+      and INT_PIN (wait_for_interrupt, check_interrupt, clear_interrupt) 
+      methods, so it can stand in for both
+    - speed scales real time; speed=None steps one sample per read for 
+      replays as fast as the CPU allows
+
+Usage:
+
+  python3 imu_trace.py record FILE [--seconds 30] [--rate 200] [--no-delta] [--int]
+    - Type calm / swing / clash (or c / s / x) + Enter while recording to 
+      add labels
+
+  python3 imu_trace.py info FILE
+
+  The simulated MPU6050 plays a recording when LIGHTSABER_SIM_TRACE=FILE
+is set (see hal_sim.py).
+
+"""
+import sys
+import time
+import bisect
+import struct
+import argparse
+import threading
+
+from frame_scheduler import FrameScheduler
+from mpu6050_class import MPU6050
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MAGIC             = b"LSTR"
+VERSION           = 1
+FLAG_DELTA        = 0x01
+
+HEADER            = struct.Struct('<4sBBHd')
+SAMPLE            = struct.Struct('<BI7h')
+DELTA             = struct.Struct('<BH7b')
+INT               = struct.Struct('<BI')
+LABEL             = struct.Struct('<BIH')
+
+REC_SAMPLE        = 1
+REC_DELTA         = 2
+REC_INT           = 3
+REC_LABEL         = 4
+
+RECORDS           = {REC_SAMPLE : SAMPLE, REC_DELTA : DELTA, REC_INT : INT, REC_LABEL : LABEL}
+
+MAX_TIME_US       = 0xFFFFFFFF
+MAX_DELTA_US      = 0xFFFF
+
+# Event kinds yielded by IMUTrace.events
+EVENT_SAMPLE      = "sample"
+EVENT_INT         = "int"
+EVENT_LABEL       = "label"
+
+# Labels
+LABEL_CALM        = 0
+LABEL_SWING       = 1
+LABEL_CLASH       = 2
+
+LABEL_NAMES       = {LABEL_CALM : "calm", LABEL_SWING : "swing", LABEL_CLASH : "clash"}
+LABEL_KEYS        = {"c" : LABEL_CALM, "s" : LABEL_SWING, "x" : LABEL_CLASH}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class TraceWriter():
+    """ Binary IMU trace writer """
+    
+    def __init__(self, path, delta=True):
+        """ Open the file and write the header """
+        self.file        = open(path, "wb")
+        self.delta       = delta
+        self.records     = 0
+        self.lock        = threading.Lock()
+
+        self._start      = None     # time.monotonic() of the first record
+        self._last_us    = 0        # Time of the previous record
+        self._last_raw   = None     # Previous sample (DELTA base)
+
+        flags = FLAG_DELTA if delta else 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, flags, 0, time.time()))
+
+    # End def
+
+
+    def _time_us(self, t):
+        """ Microseconds since the first record (records must be in order) """
+        if t is None:
+            t = time.monotonic()
+        if self._start is None:
+            self._start = t
+
+        us = max(self._last_us, int(round((t - self._start) * 1e6)))
+        if us > MAX_TIME_US:
+            raise ValueError("Trace is too long (more than {0:.0f} s)".format(MAX_TIME_US / 1e6))
+        return us
+
+    # End def
+
+
+    def write_sample(self, raw, t=None):
+        """ Write one raw (ax, ay, az, temp, gx, gy, gz) sample """
+        with self.lock:
+            us   = self._time_us(t)
+            last = self._last_raw
+            
+            if self.delta and (last is not None) and (us - self._last_us <= MAX_DELTA_US):
+                change = [new - old for new, old in zip(raw, last)]
+                if all(-128 <= value <= 127 for value in change):
+                    self.file.write(DELTA.pack(REC_DELTA, us - self._last_us, *change))
+                else:
+                    self.file.write(SAMPLE.pack(REC_SAMPLE, us, *raw))
+            else:
+                self.file.write(SAMPLE.pack(REC_SAMPLE, us, *raw))
+
+            self._last_us  = us
+            self._last_raw = tuple(raw)
+            self.records  += 1
+
+    # End def
+
+
+    def write_interrupt(self, t=None):
+        """ Write a motion interrupt """
+        with self.lock:
+            us = self._time_us(t)
+            self.file.write(INT.pack(REC_INT, us))
+            self._last_us  = us
+            self.records  += 1
+
+    # End def
+
+
+    def write_label(self, label, t=None):
+        """ Write a label (LABEL_CALM, LABEL_SWING, LABEL_CLASH or any u16) """
+        with self.lock:
+            us = self._time_us(t)
+            self.file.write(LABEL.pack(REC_LABEL, us, label))
+            self._last_us  = us
+            self.records  += 1
+
+    # End def
+
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    # End def
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# End class
+
+
+
+class TraceRecorder(threading.Thread):
+    """ Records a sensor (and its motion interrupt) to a trace file """
+    
+    def __init__(self, sensor, path, rate_hz=200, int_pin=None, delta=True):
+        """ Initialize variables """
+        threading.Thread.__init__(self, daemon=True)
+
+        self.sensor         = sensor
+        self.int_pin        = int_pin
+        self.rate_hz        = rate_hz
+        self.writer         = TraceWriter(path, delta)
+        self.stop_recorder  = False
+        self.samples        = 0
+        self.errors         = 0
+
+    # End def
+
+
+    def label(self, label):
+        """ Mark the current time with a label """
+        self.writer.write_label(label)
+
+    # End def
+
+
+    def run(self):
+        """ Record until cleanup() is called """
+        scheduler = FrameScheduler(1.0 / self.rate_hz)
+
+        while not self.stop_recorder:
+            t = time.monotonic()
+            try:
+                raw = self.sensor.read_raw_sample()
+                # Reading INT_STATUS also releases the latched interrupt
+                fired = (self.int_pin is not None) and self.int_pin.check_interrupt()
+            except OSError:
+                self.errors += 1
+                scheduler.wait()
+                continue
+
+            self.writer.write_sample(raw, t)
+            if fired:
+                self.writer.write_interrupt(t)
+            self.samples += 1
+            scheduler.wait()
+
+    # End def
+
+
+    def cleanup(self):
+        """ Stop recording and close the file """
+        self.stop_recorder = True
+        if self.is_alive():
+            self.join()
+        self.writer.close()
+
+    # End def
+
+# End class
+
+
+
+class IMUTrace():
+    """ A recorded trace """
+    
+    def __init__(self, start_time, delta, events):
+        """ events is a time ordered list of (t, kind, value) """
+        self.start_time  = start_time
+        self.delta       = delta
+        self.events      = events
+
+        self.samples     = [(t, value) for (t, kind, value) in events if kind == EVENT_SAMPLE]
+        self.interrupts  = [t for (t, kind, value) in events if kind == EVENT_INT]
+        self.labels      = [(t, value) for (t, kind, value) in events if kind == EVENT_LABEL]
+
+    # End def
+
+
+    def duration(self):
+        """ Seconds from the first to the last record """
+        if not self.events:
+            return 0.0
+        return self.events[-1][0] - self.events[0][0]
+
+    # End def
+
+
+    def rate_hz(self):
+        """ Median sample rate """
+        times = [t for (t, raw) in self.samples]
+        if len(times) < 2:
+            return 0.0
+        steps = sorted(b - a for (a, b) in zip(times, times[1:]))
+        step  = steps[len(steps) // 2]
+        return (1.0 / step) if step > 0 else 0.0
+
+    # End def
+
+
+    def as_arrays(self):
+        """ Return (times, raw) NumPy arrays: float64 seconds, (N, 7) int16 """
+        if np is None:
+            raise ImportError("IMUTrace.as_arrays() needs numpy")
+        times = np.array([t for (t, raw) in self.samples], dtype=np.float64)
+        raw   = np.array([raw for (t, raw) in self.samples], dtype=np.int16).reshape(-1, 7)
+        return times, raw
+
+    # End def
+
+# End class
+
+
+
+def read_trace(path):
+    """ Read a trace file into an IMUTrace """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError("{0}: not an IMU trace (too short)".format(path))
+    magic, version, flags, reserved, start_time = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("{0}: not an IMU trace (or not version {1})".format(path, VERSION))
+
+    events  = []
+    offset  = HEADER.size
+    us      = 0
+    raw     = None
+
+    while offset < len(data):
+        kind   = data[offset]
+        record = RECORDS.get(kind)
+        if record is None:
+            raise ValueError("{0}: bad record type {1} at byte {2}".format(path, kind, offset))
+        if offset + record.size > len(data):
+            break  # Truncated last record (recording was killed)
+        
+        fields  = record.unpack_from(data, offset)
+        offset += record.size
+
+        if kind == REC_DELTA:
+            if raw is None:
+                raise ValueError("{0}: DELTA record before the first SAMPLE".format(path))
+            us += fields[1]
+            raw = tuple(old + change for old, change in zip(raw, fields[2:]))
+            events.append((us / 1e6, EVENT_SAMPLE, raw))
+            continue
+
+        us = fields[1]
+        if kind == REC_SAMPLE:
+            raw = fields[2:]
+            events.append((us / 1e6, EVENT_SAMPLE, raw))
+        elif kind == REC_INT:
+            events.append((us / 1e6, EVENT_INT, None))
+        else:
+            events.append((us / 1e6, EVENT_LABEL, fields[2]))
+
+    return IMUTrace(start_time, bool(flags & FLAG_DELTA), events)
+
+# End def
+
+
+
+class TraceReplay():
+    """ Plays a trace as an MPU6050 and INT_PIN """
+    
+    def __init__(self, trace, speed=1.0, loop=False):
+        """ speed=None: step one sample per read instead of following the clock """
+        if not trace.samples:
+            raise ValueError("Trace has no samples")
+
+        self.trace       = trace
+        self.speed       = speed
+        self.loop        = loop and (trace.duration() > 0)
+        self.finished    = False
+
+        self._times      = [t for (t, raw) in trace.samples]
+        self._origin     = self._times[0]
+        self._length     = trace.duration()
+        self._start      = time.monotonic()
+        self._index      = -1          # Step mode: current sample
+        self._next_int   = 0           # Interrupts consumed (counting loops)
+
+    # End def
+
+
+    def now(self):
+        """ Current position in trace time (keeps growing while looping) """
+        if self.speed is None:
+            return self._times[max(self._index, 0)]
+        return self._origin + (time.monotonic() - self._start) * self.speed
+
+    # End def
+
+
+    def _position(self, t):
+        """ Map trace time onto one pass of the trace """
+        if self.loop:
+            return self._origin + ((t - self._origin) % self._length)
+        if t >= self._times[-1]:
+            self.finished = True
+        return t
+
+    # End def
+
+
+    def _interrupt_time(self, n):
+        """ Trace time of the n-th interrupt (counting loops) or None """
+        interrupts = self.trace.interrupts
+        if not interrupts:
+            return None
+        if not self.loop:
+            return interrupts[n] if n < len(interrupts) else None
+        cycles, i = divmod(n, len(interrupts))
+        return interrupts[i] + cycles * self._length
+
+    # End def
+
+
+    # -----------------------------------------------------
+    # MPU6050 methods
+    # -----------------------------------------------------
+
+    def read_raw_sample(self):
+        """ Raw 7-tuple playing now (step mode: the next sample) """
+        if self.speed is None:
+            if self._index + 1 < len(self._times):
+                self._index += 1
+            if self._index == len(self._times) - 1:
+                self.finished = True
+            return self.trace.samples[self._index][1]
+
+        t     = self._position(self.now())
+        index = max(0, bisect.bisect_right(self._times, t) - 1)
+        return self.trace.samples[index][1]
+
+    # End def
+
+
+    def get_sensor_data(self):
+        return MPU6050.decode_sample(self.read_raw_sample())
+
+    # End def
+
+
+    # -----------------------------------------------------
+    # INT_PIN methods
+    # -----------------------------------------------------
+
+    def configure_motion_detection(self, threshold=0x10, duration=0x01):
+        """ Same signature as INT_PIN, ignored: the trace already holds the interrupts """
+        pass
+
+    # End def
+
+
+    def check_interrupt(self):
+        """ True if an interrupt happened since the last check """
+        t     = self.now()
+        fired = False
+        while True:
+            next_time = self._interrupt_time(self._next_int)
+            if (next_time is None) or (next_time > t):
+                break
+            self._next_int += 1
+            fired = True
+        return fired
+
+    # End def
+
+
+    def wait_for_interrupt(self, timeout=None):
+        """ Block (in scaled real time) until the next interrupt """
+        if self.check_interrupt():
+            return True
+        if self.speed is None:
+            return False  # Step mode never waits
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            next_time = self._interrupt_time(self._next_int)
+            wait      = None if next_time is None else (next_time - self.now()) / self.speed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = remaining if wait is None else min(wait, remaining)
+            if wait is None:
+                return False  # No more interrupts and no timeout
+            time.sleep(max(0.0, wait))
+            if self.check_interrupt():
+                return True
+
+    # End def
+
+
+    def clear_interrupt(self):
+        """ check_interrupt() already consumed the interrupt """
+        pass
+
+    # End def
+
+
+    def close(self):
+        pass
+
+    # End def
+
+# End class
+
+
+
+def _record(args):
+    """ Record from the real (or simulated) MPU6050 """
+    from int_class import INT_PIN
+
+    mpu      = MPU6050()
+    int_pin  = INT_PIN(threshold=0x20, duration=0x01, bus=mpu.bus) if args.int else None
+    recorder = TraceRecorder(mpu, args.file, args.rate, int_pin, delta=not args.no_delta)
+
+    print("Recording {0} for {1} s at {2} Hz. Labels: calm / swing / clash (c / s / x) + Enter".format(
+        args.file, args.seconds, args.rate))
+    recorder.start()
+
+    # Labels typed on stdin until the time is up
+    deadline = time.monotonic() + args.seconds
+    reader   = threading.Thread(target=_read_labels, args=(recorder,), daemon=True)
+    reader.start()
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.cleanup()
+        if int_pin is not None:
+            int_pin.close()
+        mpu.close()
+
+    print("{0} samples, {1} records, {2} read errors".format(
+        recorder.samples, recorder.writer.records, recorder.errors))
+
+# End def
+
+
+def _read_labels(recorder):
+    names = {name : label for label, name in LABEL_NAMES.items()}
+    for line in sys.stdin:
+        word  = line.strip().lower()
+        label = names.get(word, LABEL_KEYS.get(word))
+        if label is None:
+            print("Unknown label {0!r}".format(word))
+            continue
+        recorder.label(label)
+        print("Label: {0}".format(LABEL_NAMES[label]))
+
+# End def
+
+
+def _info(args):
+    """ Print a summary of a trace file """
+    trace = read_trace(args.file)
+    print("{0}: recorded {1}".format(args.file, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(trace.start_time))))
+    print("  {0:.2f} s, {1} samples at {2:.0f} Hz, {3} interrupts, delta={4}".format(
+        trace.duration(), len(trace.samples), trace.rate_hz(), len(trace.interrupts), trace.delta))
+    for t, label in trace.labels:
+        print("  {0:8.3f} s  {1}".format(t, LABEL_NAMES.get(label, label)))
+
+# End def
+
+
+def main(argv=None):
+    parser   = argparse.ArgumentParser(description="Record / inspect IMU traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record the MPU6050 to a file")
+    record.add_argument("file")
+    record.add_argument("--seconds", type=float, default=30.0, help="recording length")
+    record.add_argument("--rate", type=float, default=200.0, help="samples per second")
+    record.add_argument("--no-delta", action="store_true", help="store every sample in full")
+    record.add_argument("--int", action="store_true", help="also record the motion interrupt")
+
+    info = commands.add_parser("info", help="summarise a trace file")
+    info.add_argument("file")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        _record(args)
+    else:
+        _info(args)
+    return 0
+
+# End def
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+--------------------------------------------------------------------------
+Input Reactor - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Input Reactor
+
+  Watches any number of button pins from a single thread.  Each pin is 
+exported through sysfs with edge="both" and its value file is registered with 
+epoll, so the thread sleeps in the kernel until a pin changes (or a debounce /
+long press timer is due) instead of polling GPIO.input() on a fixed period.
+
+  Edges are time stamped with time.monotonic() as soon as epoll returns. 
+Debouncing is done in software from those timestamps: the first edge after a
+quiet period is accepted immediately, further edges inside the "debounce" 
+window are ignored and the pin is read again when the window closes to pick up
+the final level.
+
+Software API:
+
+  InputReactor()
+    - Create the reactor (no thread is running yet)
+    
+    start()
+      - Start the reactor thread
+
+    add_button(pin, callback, active_low=True, debounce=0.02, long_press=None)
+      - pin is a PocketBeagle header pin (e.g. "P2_19") or a GPIO number
+      - callback(event, pin, timestamp, duration) is executed from the 
+        reactor thread for every BUTTON_PRESS, BUTTON_RELEASE and (if 
+        long_press is given, in seconds) BUTTON_LONG_PRESS event
+      - duration is the press duration for BUTTON_RELEASE / BUTTON_LONG_PRESS
+      - Raises OSError if the pin cannot be exported (e.g. no sysfs GPIO,
+        or the simulated hardware backend is selected)
+
+    remove_button(pin)
+      - Stop watching a pin
+    
+    cleanup()
+      - Stop the reactor thread and close all files
+
+"""
+import os
+import time
+import errno
+import select
+import threading
+
+import hal
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+BUTTON_PRESS        = "press"
+BUTTON_RELEASE      = "release"
+BUTTON_LONG_PRESS   = "long_press"
+
+SYSFS_GPIO          = "/sys/class/gpio"
+
+# PocketBeagle header pin -> sysfs GPIO number (bank * 32 + bit)
+PIN_TO_GPIO = {
+    "P2_2"  : 59,
+    "P2_4"  : 58,
+    "P2_6"  : 57,
+    "P2_8"  : 60,
+    "P2_17" : 65,
+    "P2_19" : 27,
+}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def pin_to_gpio(pin):
+    """ Convert a header pin name ("P2_19" / "P2_02") or GPIO number to a GPIO number """
+    if isinstance(pin, int):
+        return pin
+
+    header, _, number = pin.partition("_")
+    name = "{0}_{1}".format(header, int(number))
+    if name not in PIN_TO_GPIO:
+        raise ValueError("Unknown GPIO for pin {0}".format(pin))
+    return PIN_TO_GPIO[name]
+
+# End def
+
+
+class _Button():
+    """ State of one watched pin """
+    
+    def __init__(self, pin, gpio, fd, callback, active_low, debounce, long_press):
+        self.pin            = pin
+        self.gpio           = gpio
+        self.fd             = fd
+        self.callback       = callback
+        self.pressed_value  = 0 if active_low else 1
+        self.debounce       = debounce
+        self.long_press     = long_press
+
+        self.pressed        = False
+        self.press_time     = None
+        self.last_accept    = 0.0     # Time of the last accepted transition
+        self.recheck_time   = None    # Re-read level when the debounce window ends
+        self.long_time      = None    # When to fire BUTTON_LONG_PRESS
+
+    # End def
+
+# End class
+
+
+class InputReactor(threading.Thread):
+    """ Input Reactor Class """
+    
+    def __init__(self):
+        """ Initialize variables """
+        threading.Thread.__init__(self, daemon=True)
+
+        self.stop_reactor   = False
+        self._buttons       = {}      # fd -> _Button
+        self._lock          = threading.Lock()
+        self._epoll         = select.epoll()
+
+        # Pipe used to wake the thread up for add / remove / cleanup
+        self._wake_r, self._wake_w = os.pipe()
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+    
+    # End def
+
+
+    def add_button(self, pin, callback, active_low=True, debounce=0.02, long_press=None):
+        """ Start watching a pin (see module documentation) """
+        if hal.is_simulated():
+            # Never touch the host's sysfs GPIO when running simulated
+            raise OSError(errno.ENODEV, "sysfs GPIO not available on the sim backend")
+
+        gpio = pin_to_gpio(pin)
+        path = "{0}/gpio{1}".format(SYSFS_GPIO, gpio)
+
+        if not os.path.exists(path):
+            self._write("{0}/export".format(SYSFS_GPIO), str(gpio))
+        self._write(path + "/direction", "in")
+        self._write(path + "/edge", "both")
+
+        fd     = os.open(path + "/value", os.O_RDONLY | os.O_NONBLOCK)
+        button = _Button(pin, gpio, fd, callback, active_low, debounce, long_press)
+        button.pressed = self._read(fd) == button.pressed_value
+
+        with self._lock:
+            self._buttons[fd] = button
+            self._epoll.register(fd, select.EPOLLPRI | select.EPOLLERR)
+        self._wake()
+
+    # End def
+
+
+    def remove_button(self, pin):
+        """ Stop watching a pin """
+        with self._lock:
+            for fd, button in list(self._buttons.items()):
+                if button.pin == pin:
+                    self._epoll.unregister(fd)
+                    os.close(fd)
+                    del self._buttons[fd]
+        self._wake()
+
+    # End def
+
+
+    def run(self):
+        """ Wait for edges / timers and dispatch button events """
+        while not self.stop_reactor:
+            timeout = self._next_timeout(time.monotonic())
+            events  = self._epoll.poll(timeout)
+            now     = time.monotonic()
+
+            for fd, mask in events:
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 64)
+                    continue
+
+                with self._lock:
+                    button = self._buttons.get(fd)
+                if button is not None:
+                    self._on_edge(button, now)
+
+            self._run_timers(time.monotonic())
+
+    # End def
+
+
+    def cleanup(self):
+        """ Stop the reactor thread and close all files """
+        self.stop_reactor = True
+        self._wake()
+        if self.is_alive():
+            self.join()
+
+        with self._lock:
+            for fd in list(self._buttons):
+                os.close(fd)
+            self._buttons.clear()
+        self._epoll.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    # End def
+
+
+    # -----------------------------------------------------
+    # Internal functions
+    # -----------------------------------------------------
+
+    def _on_edge(self, button, now):
+        """ Handle an edge on a pin (timestamp now) """
+        pressed = self._read(button.fd) == button.pressed_value
+
+        if now - button.last_accept < button.debounce:
+            # Bouncing - look at the level again once the window closes
+            button.recheck_time = button.last_accept + button.debounce
+            return
+
+        if pressed != button.pressed:
+            self._transition(button, pressed, now)
+
+    # End def
+
+
+    def _run_timers(self, now):
+        """ Handle due debounce re-checks and long presses """
+        with self._lock:
+            buttons = list(self._buttons.values())
+
+        for button in buttons:
+            if button.recheck_time is not None and now >= button.recheck_time:
+                button.recheck_time = None
+                pressed = self._read(button.fd) == button.pressed_value
+                if pressed != button.pressed:
+                    self._transition(button, pressed, now)
+
+            if button.long_time is not None and now >= button.long_time:
+                button.long_time = None
+                self._emit(button, BUTTON_LONG_PRESS, now, now - button.press_time)
+
+    # End def
+
+
+    def _transition(self, button, pressed, now):
+        """ Accept a debounced level change """
+        button.pressed     = pressed
+        button.last_accept = now
+
+        if pressed:
+            button.press_time = now
+            if button.long_press is not None:
+                button.long_time = now + button.long_press
+            self._emit(button, BUTTON_PRESS, now, 0.0)
+        else:
+            button.long_time = None
+            duration = now - button.press_time if button.press_time is not None else 0.0
+            self._emit(button, BUTTON_RELEASE, now, duration)
+
+    # End def
+
+
+    def _emit(self, button, event, now, duration):
+        """ Execute the button callback """
+        try:
+            button.callback(event, button.pin, now, duration)
+        except Exception as error:
+            # Keep the reactor alive for the other buttons
+            print("InputReactor: {0} callback for {1} failed: {2}".format(event, button.pin, error))
+
+    # End def
+
+
+    def _next_timeout(self, now):
+        """ Seconds until the next timer is due (-1 = no timer) """
+        with self._lock:
+            times = [t for button in self._buttons.values()
+                     for t in (button.recheck_time, button.long_time) if t is not None]
+        if not times:
+            return -1
+        return max(0.0, min(times) - now)
+
+    # End def
+
+
+    def _wake(self):
+        os.write(self._wake_w, b"x")
+
+    # End def
+
+
+    @staticmethod
+    def _read(fd):
+        """ Read the current level of a value file """
+        os.lseek(fd, 0, os.SEEK_SET)
+        return int(os.read(fd, 2)[:1] or b"0")
+
+    # End def
+
+
+    @staticmethod
+    def _write(path, value):
+        with open(path, "w") as f:
+            f.write(value)
+
+    # End def
+
+# End class
@@ -32,8 +32,10 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 --------------------------------------------------------------------------
 """
 
-import smbus2
 import time
+from i2c_bus import I2CBus
+
+from hal import GPIO
 
 class INT_PIN:
     # MPU6050 Registers and Constants
@@ -41,23 +43,47 @@ class INT_PIN:
     PWR_MGMT_1 = 0x6B
     MOT_THR = 0x1F
     MOT_DUR = 0x20
+    INT_PIN_CFG = 0x37
     INT_ENABLE = 0x38
     INT_STATUS = 0x3A
     ACCEL_XOUT_H = 0x3B
 
-    def __init__(self, bus_number=2):
-        self.bus = smbus2.SMBus(bus_number)
-        self.bus.write_byte_data(self.MPU6050_ADDR, self.PWR_MGMT_1, 0)  # Wake up
-        self.configure_motion_detection()
+    # INT_PIN_CFG: active high, push-pull, latch the pin until INT_STATUS is
+    # read (INT_RD_CLEAR stays 0 so data reads by MPU6050 don't clear it)
+    LATCH_INT_EN = 0x20
+
+    def __init__(self, bus_number=2, gpio_pin=None, poll_interval=0.05, threshold=0x10, duration=0x01, bus=None):
+        """
+        - gpio_pin: PocketBeagle pin wired to the MPU6050 INT line (e.g. "P2_xx").
+          When given, wait_for_interrupt blocks on a GPIO edge; otherwise it
+          polls INT_STATUS over I2C every poll_interval seconds.
+        - threshold / duration: Motion detection settings (see configure_motion_detection).
+        - bus: Shared I2CBus, by default the one for bus_number (shared with MPU6050).
+          A reference is taken, so close() leaves the bus open for its other users.
+        """
+        self.bus = bus.acquire() if bus is not None else I2CBus.get(bus_number)
+        self.gpio_pin = gpio_pin
+        self.poll_interval = poll_interval
+        self.bus.write_config(self.MPU6050_ADDR, self.PWR_MGMT_1, 0)  # Wake up (skipped if MPU6050 already did)
+        self.configure_motion_detection(threshold, duration)
+
+        if gpio_pin is not None:
+            self.bus.write_config(self.MPU6050_ADDR, self.INT_PIN_CFG, self.LATCH_INT_EN)
+            GPIO.setup(gpio_pin, GPIO.IN)
+            self.check_interrupt()  # Drop anything latched before setup
+
         print("MPU6050 Interrupt Initialized.")
 
     def configure_motion_detection(self, threshold=0x10, duration=0x01):
         """
         Configure motion detection interrupt settings.
         """
-        self.bus.write_byte_data(self.MPU6050_ADDR, self.MOT_THR, threshold)
-        self.bus.write_byte_data(self.MPU6050_ADDR, self.MOT_DUR, duration)
-        self.bus.write_byte_data(self.MPU6050_ADDR, self.INT_ENABLE, 0x40)  # Enable motion interrupt
+        # MOT_THR / MOT_DUR are consecutive and go out as one block write
+        self.bus.write_registers(self.MPU6050_ADDR, [
+            (self.MOT_THR, threshold),
+            (self.MOT_DUR, duration),
+            (self.INT_ENABLE, 0x40),  # Enable motion interrupt
+        ])
         print("Motion detection configured.")
 
     def read_accel_data(self):
@@ -76,6 +102,35 @@ class INT_PIN:
         status = self.bus.read_byte_data(self.MPU6050_ADDR, self.INT_STATUS)
         return bool(status & 0x40)
 
+    def wait_for_interrupt(self, timeout=None):
+        """
+        Blocks until the motion interrupt fires or timeout (seconds) passes.
+        Returns True on a motion interrupt. With a GPIO configured there is
+        no I2C traffic while waiting: INT_STATUS is only read after an edge,
+        which also releases the latched INT line.
+        """
+        if self.gpio_pin is None:
+            return self._poll_interrupt(timeout)
+
+        # Latched high already (edge happened before we started waiting)
+        if GPIO.input(self.gpio_pin):
+            return self.check_interrupt()
+
+        timeout_ms = -1 if timeout is None else max(1, int(timeout * 1000))
+        if GPIO.wait_for_edge(self.gpio_pin, GPIO.RISING, timeout_ms) is None and not GPIO.input(self.gpio_pin):
+            return False  # Timed out
+        return self.check_interrupt()
+
+    def _poll_interrupt(self, timeout):
+        # Fallback when the INT line is not wired to a GPIO
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.check_interrupt():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
     def clear_interrupt(self):
         """
         Clears the interrupt flag (writing a 1 to bit 6).
@@ -0,0 +1,254 @@
+"""
+--------------------------------------------------------------------------
+Latency Trace - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Latency Trace
+
+  Motion-to-photon latency tracing.  A trace is started when a sample (or an
+interrupt) enters the pipeline and every stage it passes through stamps it 
+with time.monotonic().  The time since the previous stage and since the start
+of the trace are added to per-stage histograms, which keep count, max and 
+approximate p50 / p99 in fixed log-spaced buckets (no per-sample storage).
+
+  Trace ids are any hashable value chosen by the code that starts the trace
+(e.g. ("imu", seq)).  Stages downstream only need to pass the id along.
+
+  Tracing is off unless enabled (LIGHTSABER_TRACE=1 or tracer.enable()); a 
+disabled stamp() returns straight away.
+
+Software API:
+
+  tracer
+    - Shared LatencyTracer used by the lightsaber modules
+
+  LatencyTracer(max_open=1024)
+    begin(trace_id, stage, t=None)
+      - Start a trace at stage (t defaults to now)
+    
+    stamp(trace_id, stage, t=None)
+      - Record that a trace reached stage
+    
+    end(trace_id, stage, t=None)
+      - stamp() and forget the trace
+
+    dump()
+      - Return {histogram name: {count, p50_ms, p99_ms, max_ms, mean_ms}}
+    
+    report()
+      - Return dump() formatted as text
+
+  LatencyHistogram()
+    record(seconds), percentile(p), summary()
+
+"""
+import os
+import math
+import time
+import threading
+import collections
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+TRACE_ENV           = "LIGHTSABER_TRACE"
+
+BUCKETS_PER_DECADE  = 20          # ~12% wide buckets
+MIN_LATENCY         = 1e-6        # 1 us
+MAX_DECADES         = 7           # 1 us .. 10 s
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class LatencyHistogram():
+    """ Log-spaced latency histogram """
+    
+    def __init__(self):
+        self.counts = [0] * (BUCKETS_PER_DECADE * MAX_DECADES + 1)
+        self.count  = 0
+        self.total  = 0.0
+        self.max    = 0.0
+
+    # End def
+
+    def record(self, seconds):
+        """ Add one latency (seconds) """
+        if seconds <= MIN_LATENCY:
+            index = 0
+        else:
+            index = min(len(self.counts) - 1,
+                        int(math.log10(seconds / MIN_LATENCY) * BUCKETS_PER_DECADE) + 1)
+        self.counts[index] += 1
+        self.count         += 1
+        self.total         += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    # End def
+
+    def percentile(self, p):
+        """ Upper bound (seconds) of the bucket holding the p-th percentile """
+        if self.count == 0:
+            return 0.0
+        
+        target = p / 100.0 * self.count
+        seen   = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                upper = MIN_LATENCY * 10 ** (index / BUCKETS_PER_DECADE)
+                return min(upper, self.max)
+        return self.max
+
+    # End def
+
+    def summary(self):
+        """ Return count / p50 / p99 / max / mean in milliseconds """
+        return {
+            "count"     : self.count,
+            "p50_ms"    : self.percentile(50) * 1000.0,
+            "p99_ms"    : self.percentile(99) * 1000.0,
+            "max_ms"    : self.max * 1000.0,
+            "mean_ms"   : self.total / self.count * 1000.0 if self.count else 0.0,
+        }
+
+    # End def
+
+# End class
+
+
+class LatencyTracer():
+    """ Latency Tracer Class """
+    
+    def __init__(self, max_open=1024):
+        self.enabled     = False
+        self.max_open    = max_open
+        self.dropped     = 0          # Traces evicted before they ended
+        
+        self._open       = collections.OrderedDict()  # id -> (start stage, start t, last stage, last t)
+        self._histograms = {}
+        self._lock       = threading.Lock()
+
+    # End def
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    # End def
+
+    def begin(self, trace_id, stage, t=None):
+        """ Start a trace """
+        if not self.enabled:
+            return
+        if t is None:
+            t = time.monotonic()
+
+        with self._lock:
+            self._open[trace_id] = (stage, t, stage, t)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+                self.dropped += 1
+
+    # End def
+
+    def stamp(self, trace_id, stage, t=None, end=False):
+        """ Record that a trace reached stage """
+        if not self.enabled or trace_id is None:
+            return
+        if t is None:
+            t = time.monotonic()
+
+        with self._lock:
+            entry = self._open.pop(trace_id, None) if end else self._open.get(trace_id)
+            if entry is None:
+                return
+            first_stage, first_t, last_stage, last_t = entry
+
+            self._histogram("{0}->{1}".format(last_stage, stage)).record(t - last_t)
+            self._histogram("{0}=>{1}".format(first_stage, stage)).record(t - first_t)
+
+            if not end:
+                self._open[trace_id] = (first_stage, first_t, stage, t)
+
+    # End def
+
+    def end(self, trace_id, stage, t=None):
+        """ Record the last stage of a trace and forget it """
+        self.stamp(trace_id, stage, t, end=True)
+
+    # End def
+
+    def _histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = LatencyHistogram()
+        return histogram
+
+    # End def
+
+    def dump(self):
+        """ Return the histogram summaries by name ("a->b" step, "a=>b" total) """
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    # End def
+
+    def report(self):
+        """ Return dump() as a text table """
+        lines = ["{0:<32} {1:>7} {2:>9} {3:>9} {4:>9}".format("stage", "count", "p50 ms", "p99 ms", "max ms")]
+        for name, s in self.dump().items():
+            lines.append("{0:<32} {1:>7} {2:>9.3f} {3:>9.3f} {4:>9.3f}".format(
+                name, s["count"], s["p50_ms"], s["p99_ms"], s["max_ms"]))
+        return "\n".join(lines)
+
+    # End def
+
+    def reset(self):
+        with self._lock:
+            self._open.clear()
+            self._histograms.clear()
+            self.dropped = 0
+
+    # End def
+
+# End class
+
+
+tracer = LatencyTracer()
+tracer.enable(os.environ.get(TRACE_ENV) == "1")
@@ -1,187 +1,330 @@
 import time
 import sys
+import queue
+import signal
 import threading
+import concurrent.futures
 
-from led import LED
+import hal
+
+from mLED import LED
 from threaded_button import ThreadedButton
+from input_reactor import InputReactor
 from sLED_DotStar import DotStar
-from sLED_Animations import Animations
+from sLED_Compositor import Compositor
 from mpu6050_class import MPU6050
 from int_class import INT_PIN
+from motion_filter import MotionFilter, MOTION_START, MOTION_STOP
+from sensor_sampler import SensorSampler
+from latency_trace import tracer
+from startup import StartupTimer, wait_for_paths
+from saber_state import SaberState, OFF, IGNITING, IDLE, SWINGING, CLASHING, RETRACTING, BLADE_ON
 
 # -----------------------------
 # Pin assignments and globals
 # -----------------------------
 led_pins = ["P2_2", "P2_4", "P2_6", "P2_8"]
 button_pin = "P2_19"
-leds = [LED(pin) for pin in led_pins]
-current_index = [0]
-first_press = [True]
-sLED_active = [False]  # <-- changed to mutable
-flicker_active = [False]
+int_gpio_pin = None  # Pin wired to the MPU6050 INT line, None = poll INT_STATUS over I2C
+spi_device = "/dev/spidev0.0"  # sLED
+i2c_device = "/dev/i2c-2"      # MPU6050
+current_index = 0
+first_press = True
+
+# Blade state shared by the button, motion and interrupt threads
+saber = SaberState()
 
-# -----------------------------
-# sLED and animation setup
-# -----------------------------
-sLED = DotStar(num_leds=108, brightness=0.8)
-sLED.clear()
 led_colors = [
     (0, 0, 255),
     (0, 255, 0),
     (255, 0, 0),
     (255, 255, 255)
 ]
-for led in leds:
-    led.off()
+ignition_time = 0.55  # Seconds for light up / light down
+
+imu_idle_wake_hz = 1.25  # MPU6050 cycle mode rate while the blade is off
+
+motion_threshold = 2.0
+cooldown_period = 0.5
+max_history_len = 5
 
-animations = Animations(sLED, flicker_active)
-mpu = MPU6050()
-int_pin = INT_PIN()
-int_pin.configure_motion_detection(threshold=0x20, duration=0x01)  # Configurable here
+# Hardware - brought up by main()
+leds = []
+sLED = None
+compositor = None
+mpu = None      # None until (or if) the IMU comes up
+int_pin = None
+sampler = None
+input_reactor = None
+button = None
+
+timer = StartupTimer()
 
 # -----------------------------
 # Button logic
 # -----------------------------
 def handle_button_release():
+    global current_index, first_press
     press_duration = button.get_last_press_duration()
 
     if press_duration >= 2.0:
         print("Long press detected!")
 
-        if sLED_active[0]:
+        if saber.transition(RETRACTING, expected=BLADE_ON) is not None:
             print("Turning off sLED...")
-            flicker_active[0] = False
-            time.sleep(0.1)
-            animations.light_down(base_color=lambda: led_colors[current_index[0]], speed=0.01)
-            sLED_active[0] = False
-        else:
+            compositor.retract(duration=ignition_time).wait(ignition_time + 1.0)
+            saber.transition(OFF)
+        elif saber.transition(IGNITING, expected=(OFF,)) is not None:
             print("Activating sLED...")
-            r, g, b = led_colors[current_index[0]]
-            animations.light_up(base_color=lambda: (r, g, b), speed=0.01)
-            sLED_active[0] = True
+            compositor.set_base_color(led_colors[current_index])
+            compositor.ignite(duration=ignition_time).wait(ignition_time + 1.0)
+            saber.transition(IDLE, expected=(IGNITING,))
 
-        leds[current_index[0]].on()
+        leds[current_index].on()
     else:
         print(f"Short press ({press_duration:.2f}s) - cycling mLED")
 
-        if first_press[0]:
-            leds[current_index[0]].on()
-            first_press[0] = False
+        if first_press:
+            leds[current_index].on()
+            first_press = False
         else:
-            leds[current_index[0]].off()
-            current_index[0] = (current_index[0] + 1) % len(leds)
-            leds[current_index[0]].on()
+            leds[current_index].off()
+            current_index = (current_index + 1) % len(leds)
+            leds[current_index].on()
 
-        if sLED_active[0]:
-            r, g, b = led_colors[current_index[0]]
-            sLED.fill(r, g, b)
+        compositor.set_base_color(led_colors[current_index])
 
-# -----------------------------
-# Flicker thread launcher
-# -----------------------------
-def start_flicker_thread():
-    flicker_thread = threading.Thread(
-        target=animations.flicker,
-        kwargs={
-            "base_color": lambda: led_colors[current_index[0]],
-            "flicker_range": 30,
-            "speed": 0.05,
-            "is_active_func": lambda: sLED_active[0] and flicker_active[0]
-        },
-        daemon=True
-    )
-    flicker_thread.start()
+def on_saber_transition(old, new):
+    # Runs with the state locked - only quick, non-blocking calls here
+    if new == RETRACTING:
+        compositor.set_flicker(False)
+        if sampler is not None:
+            sampler.pause()
+    elif new == IGNITING:
+        set_imu_power(True)  # The gyros are up long before the ignition ends
+    elif old == IGNITING and new == IDLE:
+        if sampler is not None:
+            sampler.resume()
+    elif new == OFF:
+        set_imu_power(False)
+
+def set_imu_power(full):
+    # Full sampling while the blade is lit, accelerometer-only cycle mode while off
+    if mpu is None:
+        return
+    try:
+        if full:
+            mpu.full_power()
+        else:
+            mpu.low_power(wake_hz=imu_idle_wake_hz)
+    except OSError as error:
+        print(f"IMU power change failed ({error})")
 
 # -----------------------------
 # Motion detection logic
 # -----------------------------
 def detect_motion_and_flicker():
-    motion_history = []
-    stop_motion_history = []
-    stop_history_len = max_history_len * 10
+    motion_filter = MotionFilter(
+        window=max_history_len,
+        threshold=motion_threshold,
+        release_window=max_history_len * 10
+    )
 
-    while True:
-        if sLED_active[0]:
-            sensor_data = mpu.get_sensor_data()
-            current_motion = sensor_data["comb_accel_gyro"]
+    samples = sampler.subscribe(maxsize=16)
 
-            motion_history.append(current_motion)
-            if len(motion_history) > max_history_len:
-                motion_history.pop(0)
+    while True:
+        # Sleeps until the blade is lit - no wakeups while it is off
+        saber.wait_for(BLADE_ON)
+        motion_filter.reset()
+        while not samples.empty():
+            samples.get_nowait()  # Left over from before the blade went off
 
-            avg_motion = sum(motion_history) / len(motion_history)
+        while saber.is_on():
+            try:
+                seq, timestamp, sensor_data = samples.get(timeout=0.5)
+            except queue.Empty:
+                continue
 
-            if avg_motion > motion_threshold and not flicker_active[0]:
-                print(f"Motion detected! Avg: {avg_motion:.2f} | Starting flicker...")
-                flicker_active[0] = True
-                start_flicker_thread()
+            trace_id = ("imu", seq)
+            tracer.stamp(trace_id, "dequeue")
 
-            elif avg_motion <= motion_threshold and flicker_active[0]:
-                stop_motion_history.append(avg_motion)
-                if len(stop_motion_history) > stop_history_len:
-                    stop_motion_history.pop(0)
+            event = motion_filter.update(sensor_data["comb_accel_gyro"])
 
-                stop_avg = sum(stop_motion_history) / len(stop_motion_history)
+            if event == MOTION_START and saber.transition(SWINGING, expected=(IDLE, CLASHING)):
+                tracer.stamp(trace_id, "decision")
+                print(f"Motion detected! Avg: {motion_filter.mean:.2f} | Starting flicker...")
+                compositor.set_flicker(True, trace_id=trace_id)
+                continue
 
-                if stop_avg <= motion_threshold:
-                    print(f"Sustained calm motion. Stopping flicker. Avg: {stop_avg:.2f}")
-                    flicker_active[0] = False
-                    sLED.fill(*led_colors[current_index[0]])
-                    sLED.show()
-                    stop_motion_history.clear()
-            else:
-                stop_motion_history.clear()
+            elif event == MOTION_STOP and saber.transition(IDLE, expected=(SWINGING, CLASHING)):
+                tracer.stamp(trace_id, "decision")
+                print(f"Sustained calm motion. Stopping flicker. Avg: {motion_filter.release_mean:.2f}")
+                compositor.set_flicker(False, trace_id=trace_id)
+                continue
 
-        time.sleep(0.05)
+            # No change for the compositor - the trace ends at the filter
+            tracer.end(trace_id, "filter")
 
 # -----------------------------
 # Interrupt detection logic
 # -----------------------------
 def interrupt_flash_thread():
     flash_cooldown = 1.0
+    flash_duration = 0.1
     last_flash_time = 0
+    interrupt_count = 0
 
     while True:
-        if sLED_active[0] and int_pin.check_interrupt():
+        if not saber.is_on():
+            # Sleeps until the blade is lit - no wakeups while it is off
+            saber.wait_for(BLADE_ON)
+            int_pin.check_interrupt()  # Drop anything latched while the blade was off
+
+        # Blocks on the INT edge (or polls when no GPIO is wired)
+        if int_pin.wait_for_interrupt(timeout=0.5) and saber.is_on():
+            interrupt_count += 1
+            trace_id = ("int", interrupt_count)
+            tracer.begin(trace_id, "interrupt")
+
             current_time = time.time()
-            if current_time - last_flash_time >= flash_cooldown:
-                print("Interrupt: Sudden motion detected! Flashing white.")
-                animations.flash(
-                    base_color=lambda: led_colors[current_index[0]],
-                    flash_duration=0.1,
-                    flash_speed=0.01
-                )
-                last_flash_time = current_time
-                int_pin.clear_interrupt()
-        time.sleep(0.05)
+            if current_time - last_flash_time < flash_cooldown:
+                tracer.end(trace_id, "cooldown")
+                continue
+
+            previous = saber.transition(CLASHING, expected=(IDLE, SWINGING))
+            if previous is None:
+                tracer.end(trace_id, "state")  # Blade went off meanwhile
+                continue
+
+            print("Interrupt: Sudden motion detected! Flashing white.")
+            compositor.flash(duration=flash_duration, trace_id=trace_id)
+            last_flash_time = current_time
+            int_pin.clear_interrupt()
+
+            # Back to idle / swinging unless the motion thread moved on already
+            time.sleep(flash_duration)
+            saber.transition(previous, expected=(CLASHING,))
 
 # -----------------------------
-# Setup and run
+# Startup
 # -----------------------------
-motion_threshold = 2.0
-cooldown_period = 0.5
-max_history_len = 5
+def wait_for_device(path):
+    """ Wait for a device node (nothing to wait for on the simulator) """
+    if hal.is_simulated():
+        return
+    with timer.phase("wait " + path):
+        missing = wait_for_paths([path])
+    if missing:
+        raise OSError(f"{path} did not appear")
+
+def init_leds():
+    leds.extend(LED(pin) for pin in led_pins)
+    for led in leds:
+        led.off()
 
-button = ThreadedButton(pin=button_pin, sleep_time=0.05)
-button.set_on_release_callback(handle_button_release)
-button.start()
+def init_strip():
+    global sLED, compositor
+    wait_for_device(spi_device)
+    sLED = DotStar(num_leds=108, brightness=0.8)
+    sLED.clear()
 
-motion_thread = threading.Thread(target=detect_motion_and_flicker, daemon=True)
-motion_thread.start()
+    # The compositor thread is the only writer to the sLED - everything
+    # else posts state changes to it instead of drawing on the strip directly
+    compositor = Compositor(sLED, fps=50, base_color=led_colors[current_index], flicker_range=30)
+    compositor.start()
 
-interrupt_thread = threading.Thread(target=interrupt_flash_thread, daemon=True)
-interrupt_thread.start()
+def init_button():
+    global input_reactor, button
+    # One reactor thread watches the button pins using edge events
+    input_reactor = InputReactor()
+    input_reactor.start()
 
-print("Press Button 1 to cycle through LEDs. Press Ctrl-C to exit.")
+    button = ThreadedButton(pin=button_pin, sleep_time=0.05, reactor=input_reactor)
+    button.set_on_release_callback(handle_button_release)
+    button.start()
 
-try:
-    while True:
-        time.sleep(1)
-except KeyboardInterrupt:
-    print("Exiting...")
-finally:
-    button.cleanup()
+def init_imu():
+    global mpu, int_pin, sampler
+    wait_for_device(i2c_device)
+    mpu = MPU6050()
+    int_pin = INT_PIN(gpio_pin=int_gpio_pin, threshold=0x20, duration=0x01, bus=mpu.bus)  # Configurable here
+
+    # All MPU6050 data reads go through the sampler; it only runs while the blade is on
+    imu_sampler = SensorSampler(mpu, rate_hz=20)
+    imu_sampler.pause()
+    imu_sampler.start()
+    with saber:
+        # Holding the state so a transition can't slip in between these
+        sampler = imu_sampler
+        if saber.is_on():
+            sampler.resume()  # Blade was ignited while the IMU came up
+        elif saber.state == OFF:
+            mpu.low_power(wake_hz=imu_idle_wake_hz)
+
+    threading.Thread(target=detect_motion_and_flicker, daemon=True).start()
+    threading.Thread(target=interrupt_flash_thread, daemon=True).start()
+
+def cleanup():
+    if button is not None:
+        button.cleanup()
+    if input_reactor is not None:
+        input_reactor.cleanup()
     for led in leds:
         led.cleanup()
-    sLED.clear()
-    sLED.close()
+    if compositor is not None:
+        compositor.cleanup()
+    if sampler is not None:
+        sampler.cleanup()
+    if sLED is not None:
+        sLED.clear()
+        sLED.close()
+    if int_pin is not None:
+        int_pin.close()
+    if mpu is not None:
+        mpu.close()
+
+# -----------------------------
+# Setup and run
+# -----------------------------
+def main():
+    timer.mark("imports done")
+
+    # The LEDs, the strip and the IMU don't depend on each other. The button
+    # goes live as soon as the LEDs and the strip are up; the IMU (slowest,
+    # and the saber still works without it) finishes in the background.
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup")
+    imu = pool.submit(timer.run, "imu", init_imu)
+    critical = [pool.submit(timer.run, "leds", init_leds),
+                pool.submit(timer.run, "strip", init_strip)]
+
+    try:
+        for future in critical:
+            future.result()
+        saber.add_hook(on_saber_transition)
+        timer.run("button", init_button)
+        timer.mark("button live")
+
+        # Latency histograms (LIGHTSABER_TRACE=1) are printed on SIGUSR1 and at exit
+        signal.signal(signal.SIGUSR1, lambda signum, frame: print(tracer.report()))
+
+        print("Press Button 1 to cycle through LEDs. Press Ctrl-C to exit.")
+
+        try:
+            imu.result()
+            timer.mark("imu ready")
+        except Exception as error:
+            print(f"IMU unavailable ({error}) - running without motion effects")
+        pool.shutdown(wait=False)
+        print(timer.report())
+
+        while True:
+            signal.pause()  # Everything runs in the worker threads
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        if tracer.enabled:
+            print(tracer.report())
+        cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -53,7 +53,7 @@ Software API:
       - Turn the LED off    
 
 """
-import Adafruit_BBIO.GPIO as GPIO
+from hal import GPIO
 
 # ------------------------------------------------------------------------
 # Constants
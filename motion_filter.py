@@ -0,0 +1,236 @@
+"""
+--------------------------------------------------------------------------
+Motion Filter - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Motion Filter
+
+  Streaming filter that turns a motion metric (e.g. MPU6050 "comb_accel_gyro")
+into start / stop events for the flicker.  All history is kept in fixed size 
+ring buffers with running sums, so each update costs the same no matter how 
+long the windows are.
+
+  Motion starts when the mean of the last "window" values rises above 
+"threshold".  While active, the window mean of each calm update (mean at or
+below "release_threshold") goes into a second "release_window" buffer and 
+motion stops once that buffer holds at least "release_samples" values and its
+mean is at or below "release_threshold".  Any update that is not calm clears 
+the release buffer.  A release_threshold below threshold gives hysteresis.
+
+Software API:
+
+  RingMean(size)
+    - Fixed size ring buffer with an O(1) running mean
+    
+    push(value)
+      - Add a value (dropping the oldest when full), return the mean
+
+    clear()
+      - Empty the buffer
+
+  MotionFilter(window=5, threshold=2.0, release_window=50, 
+               release_threshold=None, release_samples=1, ema_alpha=0.2)
+    - release_threshold defaults to threshold
+    
+    update(value)
+      - Add one sample, return MOTION_START, MOTION_STOP or None
+    
+    reset(active=False)
+      - Clear all history and set the active state
+
+    Attributes:
+      - active        : True while motion is detected
+      - mean          : Mean of the last "window" values
+      - release_mean  : Mean of the release buffer (None when empty)
+      - ema           : Exponential moving average of all values
+
+"""
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MOTION_START  = "start"
+MOTION_STOP   = "stop"
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class RingMean():
+    """ Ring Buffer with Running Mean Class """
+    size                          = None
+    values                        = None
+    count                         = None
+    index                         = None
+    total                         = None
+    
+    def __init__(self, size):
+        """ Initialize variables """
+        if size < 1:
+            raise ValueError("RingMean() size must be at least 1")
+
+        self.size   = size
+        self.values = [0.0] * size
+        self.clear()
+    
+    # End def
+
+
+    def clear(self):
+        """ Empty the buffer """
+        self.count  = 0
+        self.index  = 0
+        self.total  = 0.0
+
+    # End def
+
+
+    def push(self, value):
+        """ Add a value and return the mean of the buffer """
+        if self.count == self.size:
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+
+        self.values[self.index] = value
+        self.total             += value
+        self.index             += 1
+
+        if self.index == self.size:
+            self.index = 0
+            # Re-sum once per lap so floating point error cannot build up
+            if self.count == self.size:
+                self.total = sum(self.values)
+
+        return self.total / self.count
+
+    # End def
+
+
+    def mean(self):
+        """ Return the mean of the buffer (None when empty) """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    # End def
+
+# End class
+
+
+class MotionFilter():
+    """ Motion Filter Class """
+    threshold                     = None
+    release_threshold             = None
+    release_samples               = None
+    ema_alpha                     = None
+
+    active                        = None
+    mean                          = None
+    release_mean                  = None
+    ema                           = None
+    
+    def __init__(self, window=5, threshold=2.0, release_window=50,
+                 release_threshold=None, release_samples=1, ema_alpha=0.2):
+        """ Initialize variables """
+        if release_threshold is None:
+            release_threshold = threshold
+
+        self.threshold          = threshold
+        self.release_threshold  = release_threshold
+        self.release_samples    = release_samples
+        self.ema_alpha          = ema_alpha
+
+        self._window            = RingMean(window)
+        self._release           = RingMean(release_window)
+
+        self.reset()
+    
+    # End def
+
+
+    def reset(self, active=False):
+        """ Clear all history and set the active state """
+        self._window.clear()
+        self._release.clear()
+        self.active       = active
+        self.mean         = 0.0
+        self.release_mean = None
+        self.ema          = None
+
+    # End def
+
+
+    def update(self, value):
+        """ Add one sample.
+        
+           Returns:  MOTION_START - motion was just detected
+                     MOTION_STOP  - motion just ended
+                     None         - no change
+        """
+        mean      = self._window.push(value)
+        self.mean = mean
+
+        if self.ema is None:
+            self.ema = value
+        else:
+            self.ema += self.ema_alpha * (value - self.ema)
+
+        if not self.active and mean > self.threshold:
+            self.active = True
+            self._release.clear()
+            self.release_mean = None
+            return MOTION_START
+
+        if self.active and mean <= self.release_threshold:
+            self.release_mean = self._release.push(mean)
+
+            if (self._release.count >= self.release_samples and 
+                self.release_mean <= self.release_threshold):
+                self.active = False
+                self._release.clear()
+                return MOTION_STOP
+        else:
+            self._release.clear()
+            self.release_mean = None
+
+        return None
+
+    # End def
+
+# End class
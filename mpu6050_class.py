@@ -32,18 +32,59 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 --------------------------------------------------------------------------
 """
 
-import smbus2
+from hal import smbus2
+import struct
 import time
+from i2c_bus import I2CBus
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # FIFO batches fall back to lists of tuples
 
 class MPU6050:
-    def __init__(self, bus_num=2, address=0x68):
-        self.bus = smbus2.SMBus(bus_num)
+    ACCEL_XOUT_H = 0x3B  # First of 14 data registers: accel xyz, temp, gyro xyz
+    SAMPLE_LEN = 14
+    SAMPLE = struct.Struct('>7h')  # Big-endian signed 16-bit words
+
+    # FIFO streaming registers / bits
+    SMPLRT_DIV = 0x19
+    CONFIG = 0x1A           # DLPF_CFG in bits 2:0
+    FIFO_EN = 0x23
+    INT_STATUS = 0x3A
+    USER_CTRL = 0x6A
+    FIFO_COUNTH = 0x72
+    FIFO_R_W = 0x74
+    FIFO_ACCEL_GYRO = 0x78  # XG, YG, ZG and ACCEL into the FIFO
+    USER_FIFO_EN = 0x40
+    USER_FIFO_RESET = 0x04
+    FIFO_OFLOW_INT = 0x10
+    FIFO_SIZE = 1024
+    FIFO_SAMPLE_LEN = 12    # accel xyz + gyro xyz, no temperature
+    FIFO_SAMPLE = struct.Struct('>6h')
+
+    # Low power (cycle) mode
+    PWR_MGMT_2 = 0x6C
+    PWR_CYCLE = 0x20        # PWR_MGMT_1: sleep, wake at the LP_WAKE_CTRL rate for one sample
+    PWR_TEMP_DIS = 0x08     # PWR_MGMT_1: temperature sensor off
+    STBY_GYRO = 0x07        # PWR_MGMT_2: STBY_XG, STBY_YG, STBY_ZG
+    LP_WAKE_RATES = (1.25, 5, 20, 40)  # Hz for LP_WAKE_CTRL 0-3 (PWR_MGMT_2 bits 7:6)
+    GYRO_STARTUP = 0.035    # Gyro start-up time after standby (30 ms typical)
+
+    def __init__(self, bus_num=2, address=0x68, bus=None):
+        # Shared, locked handle - INT_PIN talks to the same chip
+        self.bus = bus.acquire() if bus is not None else I2CBus.get(bus_num)
         self.address = address
         self.PWR_MGMT_1 = 0x6B
+        self.fifo_rate = None       # Samples / s while FIFO mode is enabled
+        self.fifo_overflows = 0
+        self.low_power_mode = False
+        self._ready_at = 0.0        # When the gyro data is valid after full_power()
         self.init_sensor()
 
     def init_sensor(self):
-        self.bus.write_byte_data(self.address, self.PWR_MGMT_1, 0)
+        # PWR_MGMT_2 too, in case a previous run left the gyros in standby
+        self.bus.write_registers(self.address, [(self.PWR_MGMT_1, 0), (self.PWR_MGMT_2, 0)])
 
     def read_raw_data(self, addr):
         high = self.bus.read_byte_data(self.address, addr)
@@ -53,17 +94,181 @@ class MPU6050:
             value -= 65536
         return value
 
+    def read_raw_sample(self):
+        """
+        Reads all 14 data registers in one burst and returns the raw
+        (accel_x, accel_y, accel_z, temp, gyro_x, gyro_y, gyro_z) words.
+        One transaction means all axes come from the same sample.
+        """
+        block = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, self.SAMPLE_LEN)
+        return self.SAMPLE.unpack(bytes(block))
+
     def get_sensor_data(self):
+        return self.decode_sample(self.read_raw_sample())
+
+    @staticmethod
+    def decode_sample(raw):
+        """
+        Converts a raw sample from read_raw_sample into calibrated units.
+        """
+        ax, ay, az, temp, gx, gy, gz = raw
         data = {
-            "accel_x": (self.read_raw_data(0x3B) / 16384.0) - 0.1,
-            "accel_y": (self.read_raw_data(0x3D) / 16384.0) + 0.03,
-            "accel_z": (self.read_raw_data(0x3F) / 16384.0) + 0.16,
-            "gyro_x": (self.read_raw_data(0x43) / 131.0) + 2.3,
-            "gyro_y": (self.read_raw_data(0x45) / 131.0) - 0.6,
-            "gyro_z": (self.read_raw_data(0x47) / 131.0) + 0.78,
+            "accel_x": (ax / 16384.0) - 0.1,
+            "accel_y": (ay / 16384.0) + 0.03,
+            "accel_z": (az / 16384.0) + 0.16,
+            "gyro_x": (gx / 131.0) + 2.3,
+            "gyro_y": (gy / 131.0) - 0.6,
+            "gyro_z": (gz / 131.0) + 0.78,
         }
 
         data["tot_accel"] = data["accel_x"] + data["accel_y"] + data["accel_z"] - 1
         data["tot_gyro"] = data["gyro_x"] + data["gyro_y"] + data["gyro_z"]
         data["comb_accel_gyro"] = abs(data["tot_accel"]) + abs(data["tot_gyro"] / 100)
         return data
+
+    # -----------------------------------------------------
+    # FIFO streaming mode
+    # -----------------------------------------------------
+
+    def enable_fifo(self, rate_hz=1000, dlpf=1):
+        """
+        Samples accel + gyro into the on-chip FIFO at rate_hz (up to 1 kHz).
+
+        - dlpf: DLPF_CFG 1-6 (1 = 188 Hz bandwidth). The DLPF has to be on
+          so the gyro runs at the same 1 kHz base rate as the accelerometer.
+        """
+        dlpf = max(1, min(6, dlpf))
+        divider = max(0, min(255, int(round(1000.0 / rate_hz)) - 1))
+        self.fifo_rate = 1000.0 / (1 + divider)
+
+        self.bus.write_registers(self.address, [(self.SMPLRT_DIV, divider), (self.CONFIG, dlpf)])
+        self.reset_fifo()
+        self.bus.write_config(self.address, self.FIFO_EN, self.FIFO_ACCEL_GYRO)
+
+    def disable_fifo(self):
+        self.bus.write_config(self.address, self.FIFO_EN, 0)
+        self.bus.write_byte_data(self.address, self.USER_CTRL, 0)
+        self.fifo_rate = None
+
+    def reset_fifo(self):
+        # Stop, flush and restart the FIFO
+        self.bus.write_byte_data(self.address, self.USER_CTRL, self.USER_FIFO_RESET)
+        self.bus.write_byte_data(self.address, self.USER_CTRL, self.USER_FIFO_EN)
+
+    def fifo_count(self):
+        high, low = self.bus.read_i2c_block_data(self.address, self.FIFO_COUNTH, 2)
+        return (high << 8) | low
+
+    def read_fifo_batch(self):
+        """
+        Drains every complete sample from the FIFO with one block read.
+
+        Returns an (N, 6) int16 NumPy array of raw (accel xyz, gyro xyz)
+        words, or a list of 6-tuples without NumPy. On overflow the FIFO is
+        reset, fifo_overflows is incremented and the batch is empty.
+
+        Overflow is detected from the count alone: a full FIFO reports 1024
+        bytes, which is not a whole number of samples. INT_STATUS is not read
+        here, reading it would clear a latched motion interrupt.
+        """
+        count = self.fifo_count()
+        if count >= self.FIFO_SIZE or count % self.FIFO_SAMPLE_LEN:
+            # Samples were lost and the FIFO may be misaligned, start over
+            self.fifo_overflows += 1
+            self.reset_fifo()
+            count = 0
+
+        length = (count // self.FIFO_SAMPLE_LEN) * self.FIFO_SAMPLE_LEN
+        data = self._read_fifo_bytes(length) if length else b""
+
+        if np is not None:
+            return np.frombuffer(data, dtype='>i2').reshape(-1, 6).astype(np.int16)
+        return list(self.FIFO_SAMPLE.iter_unpack(data))
+
+    def _read_fifo_bytes(self, length):
+        # SMBus block reads stop at 32 bytes, a raw I2C transfer does not
+        write = smbus2.i2c_msg.write(self.address, [self.FIFO_R_W])
+        read = smbus2.i2c_msg.read(self.address, length)
+        self.bus.i2c_rdwr(write, read)
+        return bytes(read)
+
+    def stream_samples(self, batch_interval=0.02):
+        """
+        Generator yielding (timestamp, batch) every batch_interval seconds,
+        where batch comes from read_fifo_batch and timestamp is the
+        time.monotonic() of its last sample. enable_fifo() must be called
+        first; close the generator to stop.
+        """
+        next_time = time.monotonic()
+        while True:
+            next_time += batch_interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            batch = self.read_fifo_batch()
+            if len(batch):
+                yield time.monotonic(), batch
+
+    @staticmethod
+    def decode_batch(batch):
+        """
+        Converts a FIFO batch into calibrated units. Returns an (N, 7) float
+        array of accel xyz, gyro xyz and comb_accel_gyro (NumPy), or a list
+        of get_sensor_data style dictionaries without NumPy.
+        """
+        if np is None:
+            return [MPU6050.decode_sample((ax, ay, az, 0, gx, gy, gz)) for ax, ay, az, gx, gy, gz in batch]
+
+        out = np.empty((len(batch), 7))
+        out[:, 0:3] = batch[:, 0:3] / 16384.0 + (-0.1, 0.03, 0.16)
+        out[:, 3:6] = batch[:, 3:6] / 131.0 + (2.3, -0.6, 0.78)
+        tot_accel = out[:, 0:3].sum(axis=1) - 1
+        tot_gyro = out[:, 3:6].sum(axis=1)
+        out[:, 6] = np.abs(tot_accel) + np.abs(tot_gyro / 100)
+        return out
+
+    # -----------------------------------------------------
+    # Low power idle
+    # -----------------------------------------------------
+
+    def low_power(self, wake_hz=5):
+        """
+        Accelerometer only cycle mode for while the blade is off: the chip
+        sleeps and wakes at wake_hz (rounded up to 1.25, 5, 20 or 40 Hz) for
+        one accelerometer sample. The gyros and the temperature sensor are
+        in standby, so data reads return the last accelerometer sample and
+        no gyro data. Stop FIFO mode first.
+        """
+        code = next((i for i, rate in enumerate(self.LP_WAKE_RATES) if rate >= wake_hz),
+                    len(self.LP_WAKE_RATES) - 1)
+        self.bus.write_registers(self.address, [
+            (self.PWR_MGMT_1, self.PWR_CYCLE | self.PWR_TEMP_DIS),
+            (self.PWR_MGMT_2, (code << 6) | self.STBY_GYRO),
+        ])
+        self.low_power_mode = True
+
+    def full_power(self):
+        """
+        Back to continuous sampling of all sensors. The gyros need
+        GYRO_STARTUP seconds before their data is valid (see wait_ready);
+        returns that time, or 0.0 if the chip was not in low power mode.
+        """
+        if not self.low_power_mode:
+            return 0.0
+        self.bus.write_registers(self.address, [(self.PWR_MGMT_1, 0), (self.PWR_MGMT_2, 0)])
+        self.low_power_mode = False
+        self._ready_at = time.monotonic() + self.GYRO_STARTUP
+        return self.GYRO_STARTUP
+
+    def wait_ready(self):
+        """
+        Sleeps until the gyro data is valid after full_power(). SensorSampler
+        calls it when it resumes.
+        """
+        delay = self._ready_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def close(self):
+        self.bus.close()
@@ -0,0 +1,473 @@
+"""
+--------------------------------------------------------------------------
+Parameter Sweep - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Parameter Sweep
+
+  Offline tuning of the motion and clash detection settings in 
+lightsaber.py against labelled IMU recordings (see imu_trace.py).  Every 
+combination of the settings below is played over every trace and scored:
+
+    motion_threshold   --threshold      MotionFilter threshold
+    max_history_len    --history        MotionFilter window (samples)
+    stop window        --stop-window    release_window = history * this
+    release_samples    --stop-samples   calm samples needed to stop
+    flash_cooldown     --cooldown       seconds between clash flashes
+    INT threshold      --int-threshold  MOT_THR register value
+
+  The motion filter sees the trace resampled at the SensorSampler rate 
+(--rate, 20 Hz in lightsaber.py).  Its window means are computed for a whole
+trace at once with NumPy; the start / stop decisions then only need a 
+search per event, so one setting costs about the same as one pass over the
+trace.  Without NumPy each setting is run through MotionFilter sample by 
+sample instead.  The settings are spread across a process pool (--jobs).
+
+  The motion interrupt is emulated from the recorded accelerometer: it 
+fires when the change between two samples on any axis is larger than 
+MOT_THR * INT_LSB_G for MOT_DUR milliseconds.  This stands in for the 
+sensor's high pass filter and is only approximate; the interrupts recorded
+in the trace are not used.
+
+  Scoring uses the trace labels: each label applies until the next one
+(time before the first label is ignored).
+
+    motion  : a swing segment is detected when flicker starts in it (or is 
+              already on); latency is from the segment start.  A start 
+              during a calm segment is a false positive.
+    stop    : latency from the start of a calm segment to the flicker 
+              stopping, when flicker was on.
+    clash   : a clash segment is detected when a flash happens in it; a 
+              flash outside a clash segment is a false positive.
+
+Software API:
+
+  prepare_trace(trace, rate_hz=20)
+    - Precompute the per-trace arrays used by evaluate()
+
+  evaluate(settings, prepared)
+    - Score one settings dictionary over a list of prepared traces
+
+  sweep(paths, grid, rate_hz=20, jobs=None)
+    - Score every combination in grid (dictionary of name: list of values),
+      best first
+
+Usage:
+
+  python3 param_sweep.py TRACE [TRACE ...] [--threshold 1.5 2.0 2.5] 
+                         [--history 3 5 8] [--stop-window 10] 
+                         [--stop-samples 1 3] [--cooldown 0.5 1.0]
+                         [--int-threshold 0x10 0x20 0x40] [--rate 20]
+                         [--jobs N] [--top 10] [--output FILE]
+
+"""
+import os
+import sys
+import json
+import time
+import bisect
+import argparse
+import itertools
+import concurrent.futures
+
+from imu_trace import read_trace, LABEL_CALM, LABEL_SWING, LABEL_CLASH
+from mpu6050_class import MPU6050
+from motion_filter import MotionFilter, MOTION_START, MOTION_STOP
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+SAMPLE_RATE       = 20            # SensorSampler rate in lightsaber.py
+INT_LSB_G         = 0.002         # Acceleration change per MOT_THR count
+INT_DURATION_MS   = 1             # MOT_DUR used by lightsaber.py
+
+# The settings lightsaber.py uses today
+CURRENT = {
+    "motion_threshold"  : 2.0,
+    "max_history_len"   : 5,
+    "stop_window"       : 10,
+    "release_samples"   : 1,
+    "flash_cooldown"    : 1.0,
+    "int_threshold"     : 0x20,
+}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# Prepared traces of a pool worker (loaded once by _init_worker)
+_worker_traces = None
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def prepare_trace(trace, rate_hz=SAMPLE_RATE):
+    """ Resample and decode a trace once for all settings """
+    times = [t for (t, raw) in trace.samples]
+    raws  = [raw for (t, raw) in trace.samples]
+    if not times:
+        raise ValueError("Trace has no samples")
+
+    # What SensorSampler would have seen: the newest sample at each tick
+    count   = int((times[-1] - times[0]) * rate_hz) + 1
+    ticks   = [times[0] + i / rate_hz for i in range(count)]
+    picks   = [bisect.bisect_right(times, t) - 1 for t in ticks]
+
+    # Label segments (start, end, label)
+    labels   = trace.labels
+    end      = times[-1]
+    segments = [(t, labels[i + 1][0] if i + 1 < len(labels) else end, label)
+                for i, (t, label) in enumerate(labels)]
+
+    if np is None:
+        metric = [MPU6050.decode_sample(raws[i])["comb_accel_gyro"] for i in picks]
+        accel  = [(ax / 16384.0, ay / 16384.0, az / 16384.0) for (ax, ay, az, temp, gx, gy, gz) in raws]
+        return {"ticks": ticks, "metric": metric, "times": times, "accel": accel, "segments": segments}
+
+    raw     = np.array(raws, dtype=np.float64)
+    # decode_sample is plain arithmetic, so it works on whole columns
+    metric  = MPU6050.decode_sample(raw[picks].T)["comb_accel_gyro"]
+    return {
+        "ticks"     : np.array(ticks),
+        "metric"    : metric,
+        "times"     : np.array(times),
+        "accel"     : raw[:, 0:3] / 16384.0,
+        "segments"  : segments,
+    }
+
+# End def
+
+
+def moving_mean(values, window):
+    """ RingMean means of a whole array (partial windows at the start) """
+    total  = np.cumsum(values)
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    ahead  = np.concatenate((np.zeros(window), total[:-window])) if len(values) > window else np.zeros(len(values))
+    return (total - ahead[:len(values)]) / counts
+
+# End def
+
+
+def run_lengths(flags):
+    """ Number of consecutive True values ending at each index """
+    index = np.arange(len(flags))
+    last  = np.maximum.accumulate(np.where(flags, -1, index))
+    return np.where(flags, index - last, 0)
+
+# End def
+
+
+def motion_events(prepared, settings):
+    """ Time ordered [(t, MOTION_START / MOTION_STOP)] for one trace """
+    ticks     = prepared["ticks"]
+    threshold = settings["motion_threshold"]
+    window    = settings["max_history_len"]
+    needed    = settings["release_samples"]
+    release   = window * settings["stop_window"]
+
+    if np is None:
+        motion_filter = MotionFilter(window=window, threshold=threshold, 
+                                     release_window=release, release_samples=needed)
+        events = []
+        for t, value in zip(ticks, prepared["metric"]):
+            event = motion_filter.update(value)
+            if event is not None:
+                events.append((t, event))
+        return events
+
+    # While active, every calm mean goes into the release buffer, so its mean
+    # is always calm: motion stops after "needed" calm samples in a row (and
+    # never when the buffer is smaller than that).
+    mean   = moving_mean(prepared["metric"], window)
+    starts = np.flatnonzero(mean > threshold)
+    stops  = np.flatnonzero(run_lengths(mean <= threshold) >= needed) if needed <= release else np.array([], dtype=int)
+
+    events = []
+    index  = 0
+    while True:
+        i = bisect.bisect_left(starts, index)
+        if i == len(starts):
+            break
+        start = starts[i]
+        events.append((ticks[start], MOTION_START))
+
+        j = bisect.bisect_left(stops, start + needed)
+        if j == len(stops):
+            break
+        stop = stops[j]
+        events.append((ticks[stop], MOTION_STOP))
+        index = stop + 1
+    return events
+
+# End def
+
+
+def interrupt_times(prepared, int_threshold):
+    """ Emulated motion interrupt times for one trace """
+    times  = prepared["times"]
+    limit  = int_threshold * INT_LSB_G
+    if len(times) < 2:
+        return []
+    rate   = (len(times) - 1) / max(times[-1] - times[0], 1e-9)
+    needed = max(1, int(round(INT_DURATION_MS * rate / 1000.0)))
+
+    if np is None:
+        accel  = prepared["accel"]
+        result = []
+        run    = 0
+        for i in range(1, len(accel)):
+            moved = max(abs(a - b) for a, b in zip(accel[i], accel[i - 1])) > limit
+            run   = run + 1 if moved else 0
+            if run == needed:
+                result.append(times[i])
+        return result
+
+    moved = np.abs(np.diff(prepared["accel"], axis=0)).max(axis=1) > limit
+    fired = np.flatnonzero(run_lengths(moved) == needed) + 1
+    return times[fired].tolist()
+
+# End def
+
+
+def flash_times(interrupts, cooldown):
+    """ Interrupts that pass the flash cooldown """
+    flashes = []
+    for t in interrupts:
+        if not flashes or t - flashes[-1] >= cooldown:
+            flashes.append(t)
+    return flashes
+
+# End def
+
+
+def _active_at(events, t):
+    """ Motion state just before time t """
+    active = False
+    for event_time, event in events:
+        if event_time >= t:
+            break
+        active = (event == MOTION_START)
+    return active
+
+# End def
+
+
+def _between(times, begin, end):
+    return [t for t in times if begin <= t < end]
+
+# End def
+
+
+def score(events, flashes, segments, result):
+    """ Add the counts / latencies of one trace to result """
+    starts = [t for (t, event) in events if event == MOTION_START]
+    stops  = [t for (t, event) in events if event == MOTION_STOP]
+
+    for begin, end, label in segments:
+        in_segment = lambda times: _between(times, begin, end)
+
+        if label == LABEL_SWING:
+            found = in_segment(starts)
+            if _active_at(events, begin):
+                result["motion_latency"].append(0.0)
+            elif found:
+                result["motion_latency"].append(found[0] - begin)
+            else:
+                result["motion_missed"] += 1
+            result["clash_false"] += len(in_segment(flashes))
+
+        elif label == LABEL_CLASH:
+            found = in_segment(flashes)
+            if found:
+                result["clash_latency"].append(found[0] - begin)
+                result["clash_false"] += len(found) - 1
+            else:
+                result["clash_missed"] += 1
+
+        elif label == LABEL_CALM:
+            result["motion_false"] += len(in_segment(starts))
+            result["clash_false"]  += len(in_segment(flashes))
+            found = in_segment(stops)
+            if found and _active_at(events, begin):
+                result["stop_latency"].append(found[0] - begin)
+
+# End def
+
+
+def evaluate(settings, prepared):
+    """ Score one settings dictionary over a list of prepared traces """
+    result = {
+        "motion_missed"   : 0,
+        "motion_false"    : 0,
+        "clash_missed"    : 0,
+        "clash_false"     : 0,
+        "motion_latency"  : [],
+        "stop_latency"    : [],
+        "clash_latency"   : [],
+    }
+
+    for trace in prepared:
+        # The interrupts only depend on the INT threshold - keep them per trace
+        cache = trace.setdefault("interrupts", {})
+        if settings["int_threshold"] not in cache:
+            cache[settings["int_threshold"]] = interrupt_times(trace, settings["int_threshold"])
+
+        events  = motion_events(trace, settings)
+        flashes = flash_times(cache[settings["int_threshold"]], settings["flash_cooldown"])
+        score(events, flashes, trace["segments"], result)
+
+    summary = {"settings" : settings}
+    for name in ("motion_missed", "motion_false", "clash_missed", "clash_false"):
+        summary[name] = result[name]
+    for name in ("motion_latency", "stop_latency", "clash_latency"):
+        values = result[name]
+        summary[name + "_ms"] = round(1000.0 * sum(values) / len(values), 1) if values else None
+    summary["errors"] = (summary["motion_missed"] + summary["motion_false"] + 
+                         summary["clash_missed"] + summary["clash_false"])
+    return summary
+
+# End def
+
+
+def _rank(summary):
+    """ Sort key: fewest errors, then lowest latency """
+    latency = sum(summary[name] or 0.0 for name in ("motion_latency_ms", "stop_latency_ms", "clash_latency_ms"))
+    return (summary["errors"], latency)
+
+# End def
+
+
+def _init_worker(paths, rate_hz):
+    global _worker_traces
+    _worker_traces = [prepare_trace(read_trace(path), rate_hz) for path in paths]
+
+# End def
+
+
+def _evaluate_chunk(chunk):
+    return [evaluate(settings, _worker_traces) for settings in chunk]
+
+# End def
+
+
+def sweep(paths, grid, rate_hz=SAMPLE_RATE, jobs=None):
+    """ Score every combination of grid over the traces, best first """
+    names    = list(grid)
+    settings = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    jobs     = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        _init_worker(paths, rate_hz)
+        results = _evaluate_chunk(settings)
+    else:
+        # A few chunks per worker keeps the pool busy without much IPC
+        size    = max(1, len(settings) // (jobs * 4))
+        chunks  = [settings[i:i + size] for i in range(0, len(settings), size)]
+        results = []
+        with concurrent.futures.ProcessPoolExecutor(jobs, initializer=_init_worker, 
+                                                    initargs=(paths, rate_hz)) as pool:
+            for chunk in pool.map(_evaluate_chunk, chunks):
+                results.extend(chunk)
+
+    return sorted(results, key=_rank)
+
+# End def
+
+
+def _format(summary):
+    s = summary["settings"]
+    latency = lambda value: "-" if value is None else "{0:.0f}".format(value)
+    return "{0:6.2f} {1:4d} {2:5d} {3:5d} {4:6.2f} {5:#6x} | {6:5d} {7:5d} {8:5d} {9:5d} | {10:>6} {11:>6} {12:>6}".format(
+        s["motion_threshold"], s["max_history_len"], s["stop_window"], s["release_samples"],
+        s["flash_cooldown"], s["int_threshold"],
+        summary["motion_missed"], summary["motion_false"], summary["clash_missed"], summary["clash_false"],
+        latency(summary["motion_latency_ms"]), latency(summary["stop_latency_ms"]), latency(summary["clash_latency_ms"]))
+
+# End def
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep motion / clash detection settings over IMU traces")
+    parser.add_argument("traces", nargs="+", help="labelled trace files (imu_trace.py)")
+    parser.add_argument("--threshold", type=float, nargs="+", default=[1.0, 1.5, 2.0, 2.5, 3.0])
+    parser.add_argument("--history", type=int, nargs="+", default=[3, 5, 8])
+    parser.add_argument("--stop-window", type=int, nargs="+", default=[CURRENT["stop_window"]])
+    parser.add_argument("--stop-samples", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--cooldown", type=float, nargs="+", default=[0.5, 1.0])
+    parser.add_argument("--int-threshold", type=lambda text: int(text, 0), nargs="+", default=[0x10, 0x20, 0x40])
+    parser.add_argument("--rate", type=float, default=SAMPLE_RATE, help="motion filter sample rate (Hz)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=10, help="number of settings to print")
+    parser.add_argument("--output", help="write all results to this JSON file")
+    args = parser.parse_args(argv)
+
+    grid = {
+        "motion_threshold"  : args.threshold,
+        "max_history_len"   : args.history,
+        "stop_window"       : args.stop_window,
+        "release_samples"   : args.stop_samples,
+        "flash_cooldown"    : args.cooldown,
+        "int_threshold"     : args.int_threshold,
+    }
+
+    start   = time.monotonic()
+    results = sweep(args.traces, grid, args.rate, args.jobs)
+    print("{0} settings x {1} traces in {2:.1f} s (numpy: {3})".format(
+        len(results), len(args.traces), time.monotonic() - start, np is not None))
+
+    print(" thres hist  stop need  cool   int | m_mis m_fal c_mis c_fal |  m_lat  s_lat  c_lat (ms)")
+    for summary in results[:args.top]:
+        print(_format(summary))
+
+    current = sweep(args.traces, {name : [value] for name, value in CURRENT.items()}, args.rate, jobs=1)[0]
+    print("current settings:")
+    print(_format(current))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"current" : current, "results" : results}, f, indent=2)
+    return 0
+
+# End def
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main())
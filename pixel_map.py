@@ -0,0 +1,397 @@
+"""
+--------------------------------------------------------------------------
+Pixel Map - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Pixel Map
+
+  Logical to physical pixel mapping for builds with more than one LED strip
+(e.g. a dual blade, or one blade lit by several strips on separate SPI 
+buses).  The logical strip is made of segments; each segment is a run of 
+LEDs on one physical strip, optionally reversed (wired from the tip back 
+to the hilt).  Segments follow each other in logical order unless a 
+segment gives its own logical start, which lets two segments show the same
+logical pixels (a folded strip lit on both sides of the blade).
+
+  MultiStrip drives the physical DotStar strips through a PixelMap with the
+same API as one DotStar, so the Compositor and Animations work on it 
+unchanged.  Each strip beyond the first has its own flush thread: show() 
+sends every strip at the same time and returns when all are done, so a 
+frame takes as long as the longest strip instead of the sum of all strips.
+The transfers only overlap when the spidev build releases the GIL during 
+the ioctl and the strips are on different SPI buses.
+
+Software API:
+
+  Segment(strip, first, count, reverse=False, start=None)
+    - count LEDs from LED first of physical strip number "strip"; start is
+      the logical index of the segment (default: after the previous one)
+
+  PixelMap(segments)
+    num_leds
+      - Logical strip length
+
+    runs(start, stop)
+      - (strip, logical_start, logical_stop, physical_start, reverse) for 
+        each segment run that covers logical pixels [start, stop)
+
+    physical(n)
+      - [(strip, led)] that show logical pixel n
+
+  MultiStrip(strips, segments=None)
+    - strips is a list of DotStar objects; segments default to the strips
+      one after the other
+    - DotStar API: set_pixel_color, fill, clear, set_range, set_pixels,
+      scale, blend, show, flush, stats, frame_bytes, show_frame, 
+      set_brightness / brightness, close
+    - show() skips the strips with nothing new to send and does not wake
+      their flush threads
+
+"""
+import threading
+import collections
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only needed with NumPy strips
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+Segment = collections.namedtuple("Segment", "strip first count reverse start", defaults=(False, None))
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class PixelMap():
+    """ Logical to Physical Pixel Map Class """
+    
+    def __init__(self, segments):
+        """ segments: Segment tuples (or plain tuples in the same order) """
+        self.segments = []
+        end           = 0
+
+        for segment in segments:
+            segment = Segment(*segment)
+            if segment.count < 1 or segment.first < 0:
+                raise ValueError("Bad segment {0}".format(segment))
+            if segment.start is None:
+                segment = segment._replace(start=end)
+            self.segments.append(segment)
+            end = max(end, segment.start + segment.count)
+
+        self.num_leds = end
+
+    # End def
+
+
+    def runs(self, start, stop):
+        """ Segment runs covering logical pixels [start, stop) """
+        result = []
+        for strip, first, count, reverse, begin in self.segments:
+            lo = max(start, begin)
+            hi = min(stop, begin + count)
+            if lo >= hi:
+                continue
+            if reverse:
+                # Logical lo is the physically highest LED of the run
+                physical = first + (begin + count - hi)
+            else:
+                physical = first + (lo - begin)
+            result.append((strip, lo, hi, physical, reverse))
+        return result
+
+    # End def
+
+
+    def physical(self, n):
+        """ [(strip, led)] that show logical pixel n """
+        return [(strip, physical + (hi - 1 - n if reverse else n - lo))
+                for strip, lo, hi, physical, reverse in self.runs(n, n + 1)]
+
+    # End def
+
+# End class
+
+
+
+class _Flusher(threading.Thread):
+    """ Sends one strip's frame when told to """
+    
+    def __init__(self, strip):
+        threading.Thread.__init__(self, daemon=True)
+        self.strip         = strip
+        self.frame         = None     # None: flush(force), else show_frame(frame)
+        self.force         = False
+        self.sent          = False
+        self.error         = None
+        self.go            = threading.Event()
+        self.done          = threading.Event()
+        self.stop_flusher  = False
+
+    # End def
+
+
+    def run(self):
+        while True:
+            self.go.wait()
+            self.go.clear()
+            if self.stop_flusher:
+                break
+            try:
+                if self.frame is None:
+                    self.sent = self.strip.flush(self.force)
+                else:
+                    self.strip.show_frame(self.frame)
+                    self.sent = True
+            except Exception as error:
+                self.error = error   # Raised again by MultiStrip._flush
+            self.done.set()
+
+    # End def
+
+# End class
+
+
+
+class MultiStrip():
+    """ Several physical strips as one logical DotStar """
+    
+    def __init__(self, strips, segments=None):
+        """ Initialize variables """
+        if not strips:
+            raise ValueError("MultiStrip needs at least one strip")
+        if segments is None:
+            segments = [Segment(i, 0, strip.num_leds) for i, strip in enumerate(strips)]
+
+        self.strips     = list(strips)
+        self.map        = PixelMap(segments)
+        self.num_leds   = self.map.num_leds
+        self.use_numpy  = all(getattr(strip, "use_numpy", False) for strip in self.strips)
+
+        for strip, first, count, reverse, start in self.map.segments:
+            if strip >= len(self.strips) or first + count > self.strips[strip].num_leds:
+                raise ValueError("Segment {0} does not fit strip {1}".format((strip, first, count), strip))
+
+        # The calling thread sends the first strip, one thread per other strip
+        self._flushers = [_Flusher(strip) for strip in self.strips[1:]]
+        for flusher in self._flushers:
+            flusher.start()
+
+    # End def
+
+
+    @property
+    def brightness(self):
+        return self.strips[0].brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        self.set_brightness(brightness)
+
+    # End def
+
+
+    def set_brightness(self, brightness):
+        for strip in self.strips:
+            strip.set_brightness(brightness)
+
+    # End def
+
+
+    def set_pixel_color(self, n, r, g, b):
+        for strip, led in self.map.physical(n):
+            self.strips[strip].set_pixel_color(led, r, g, b)
+
+    # End def
+
+
+    def set_range(self, start, stop, r, g, b):
+        """ Sets logical LEDs [start, stop) to one color """
+        for strip, lo, hi, physical, reverse in self.map.runs(start, stop):
+            self.strips[strip].set_range(physical, physical + (hi - lo), r, g, b)
+
+    # End def
+
+
+    def fill(self, r, g, b, show=True):
+        self.set_range(0, self.num_leds, r, g, b)
+        if show:
+            self.show()
+
+    # End def
+
+
+    def clear(self):
+        self.fill(0, 0, 0)
+
+    # End def
+
+
+    def set_pixels(self, pixels, start=0):
+        """ Copies logical RGB values (list of tuples or (M, 3) array) from start """
+        stop = min(self.num_leds, start + len(pixels))
+        for strip, lo, hi, physical, reverse in self.map.runs(start, stop):
+            run = pixels[lo - start:hi - start]
+            self.strips[strip].set_pixels(run[::-1] if reverse else run, physical)
+
+    # End def
+
+
+    def get_pixels(self):
+        """ Logical RGB values (list of tuples, or an (N, 3) array with NumPy) """
+        if self.use_numpy:
+            pixels = np.zeros((self.num_leds, 3), dtype=np.uint8)
+        else:
+            pixels = [(0, 0, 0)] * self.num_leds
+
+        for strip, lo, hi, physical, reverse in self.map.runs(0, self.num_leds):
+            run = self.strips[strip].pixels[physical:physical + (hi - lo)]
+            pixels[lo:hi] = run[::-1] if reverse else run
+        return pixels
+
+    # End def
+
+
+    def scale(self, factor):
+        # Scaling the physical strips scales every mapped pixel the same way
+        for strip in self.strips:
+            strip.scale(factor)
+
+    # End def
+
+
+    def blend(self, other, alpha):
+        """ Mixes the logical strip towards a color or per-LED sequence """
+        alpha = max(0.0, min(alpha, 1.0))
+        if self.use_numpy:
+            mixed = self.get_pixels() * (1.0 - alpha) + np.asarray(other, dtype=np.float64) * alpha
+            mixed = (mixed + 0.5).astype(np.uint8)
+        else:
+            if len(other) == 3 and not isinstance(other[0], (tuple, list)):
+                other = [tuple(other)] * self.num_leds
+            keep  = 1.0 - alpha
+            mixed = [
+                (int(r * keep + ro * alpha + 0.5), int(g * keep + go * alpha + 0.5), int(b * keep + bo * alpha + 0.5))
+                for (r, g, b), (ro, go, bo) in zip(self.get_pixels(), other)
+            ]
+        self.set_pixels(mixed)
+
+    # End def
+
+
+    def show(self):
+        """ Sends the strips that changed, returns True if any frame was sent """
+        return self.flush()
+
+    # End def
+
+
+    def flush(self, force=False):
+        return self._flush(None, force)
+
+    # End def
+
+
+    def stats(self):
+        """ Frame counters of each strip """
+        return [strip.stats() for strip in self.strips]
+
+    # End def
+
+
+    def frame_bytes(self):
+        # One encoded frame per physical strip
+        return tuple(strip.frame_bytes() for strip in self.strips)
+
+    # End def
+
+
+    def show_frame(self, frame):
+        self._flush(frame)
+
+    # End def
+
+
+    def _flush(self, frames, force=False):
+        """ Send every strip at once, return when all are sent """
+        sent    = False
+        running = []
+        for i, flusher in enumerate(self._flushers):
+            if frames is None and not force and not flusher.strip.dirty:
+                # Nothing to send, the strip only counts the elided frame
+                flusher.strip.flush()
+                continue
+            flusher.frame = None if frames is None else frames[i + 1]
+            flusher.force = force
+            flusher.done.clear()
+            flusher.go.set()
+            running.append(flusher)
+
+        if frames is None:
+            sent = self.strips[0].flush(force)
+        else:
+            self.strips[0].show_frame(frames[0])
+            sent = True
+
+        error = None
+        for flusher in running:
+            flusher.done.wait()
+            sent = sent or flusher.sent
+            if flusher.error is not None:
+                error, flusher.error = flusher.error, None
+        if error is not None:
+            raise error
+        return sent
+
+    # End def
+
+
+    def close(self):
+        for flusher in self._flushers:
+            flusher.stop_flusher = True
+            flusher.go.set()
+            flusher.join()
+        for strip in self.strips:
+            strip.close()
+
+    # End def
+
+# End class
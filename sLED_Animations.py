@@ -33,10 +33,16 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 # Import libraries
-import spidev
 import time
 import random
+from collections import OrderedDict
 from sLED_DotStar import DotStar
+from frame_scheduler import FrameScheduler
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 #-----------------------------------------------------------------------
@@ -57,14 +63,202 @@ acceleration change occurs using the interrupt pin.
 
 light_down : animates sLED to turn off from end - UNFINISHED
 
+light_up and light_down are timed by a FrameScheduler: each step is due at
+start + k * speed on the monotonic clock, so encode and SPI time come out
+of the sleep, and steps that are already late are drawn together in one
+frame. The whole animation therefore takes steps * speed (or duration)
+seconds. Timing counters of the last run are kept in last_timing.
+
+AnimationCache : LRU cache of fully encoded light_up / light_down frames,
+keyed by (effect, color, length) and the strip's brightness, gamma, color
+balance and global brightness mode. After the first run of an effect in a
+color, playback only sends stored frames over SPI.
+
+FlickerNoise : bank of precomputed per-LED noise frames used by flicker, so
+a flicker frame is one clamp of the whole strip instead of 3 randint calls
+and 3 clamps per LED.
+
 """
 
+class FlickerNoise:
+    """
+    Precomputed, optionally temporally smoothed, flicker noise for a strip.
+
+    Parameters:
+    - num_leds: Number of LEDs on the strip.
+    - flicker_range: Noise is drawn from [-flicker_range, flicker_range].
+    - bank_size: Number of noise frames generated up front (played in a loop).
+    - smoothing: 0.0 = independent noise every frame (original look), values
+      towards 1.0 low-pass the noise over time for a slower shimmer.
+    - use_numpy: Produce (N, 3) uint8 arrays (for DotStar(use_numpy=True))
+      instead of lists of (r, g, b) tuples.
+
+    The bank is built on the first next_frame() (or an explicit build()), so
+    creating a FlickerNoise is cheap. In list mode the noise is limited to
+    +-127, which already spans the whole 0 - 255 range.
+    """
+
+    MAX_CACHED_COLORS = 8  # Clamp tables kept per base color (list mode, 768 bytes each)
+
+    def __init__(self, num_leds, flicker_range=30, bank_size=256, smoothing=0.0, use_numpy=False):
+        if use_numpy and np is None:
+            raise ImportError("numpy is required for FlickerNoise(use_numpy=True)")
+
+        self.num_leds = num_leds
+        self.flicker_range = flicker_range
+        self.bank_size = bank_size
+        self.smoothing = smoothing
+        self.use_numpy = use_numpy
+        self.index = random.randrange(bank_size)
+        self.bank = None
+        self._luts = {}  # base color -> (r, g, b) clamp tables (list mode)
+
+    def build(self):
+        """
+        Generates the noise bank if it was not built yet.
+        """
+        if self.bank is not None:
+            return
+        num_leds = self.num_leds
+        bank_size = self.bank_size
+        smoothing = self.smoothing
+
+        if self.use_numpy:
+            flicker_range = self.flicker_range
+            rng = np.random.default_rng()
+            raw = rng.integers(-flicker_range, flicker_range + 1, size=(bank_size, num_leds, 3))
+            if smoothing > 0.0:
+                raw = raw.astype(np.float64)
+                for k in range(1, bank_size):
+                    raw[k] = smoothing * raw[k - 1] + (1.0 - smoothing) * raw[k]
+            self.bank = np.rint(raw).astype(np.int16)
+        else:
+            # Each frame is stored as bytes of r, g, b offsets shifted by
+            # +flicker_range (3 bytes per LED instead of a list of tuples)
+            flicker_range = self._list_range()
+            bank = []
+            prev = None
+            for k in range(bank_size):
+                frame = [
+                    (random.randint(-flicker_range, flicker_range),
+                     random.randint(-flicker_range, flicker_range),
+                     random.randint(-flicker_range, flicker_range))
+                    for i in range(num_leds)
+                ]
+                if prev is not None and smoothing > 0.0:
+                    keep = 1.0 - smoothing
+                    frame = [
+                        (round(smoothing * pr + keep * r), round(smoothing * pg + keep * g), round(smoothing * pb + keep * b))
+                        for (pr, pg, pb), (r, g, b) in zip(prev, frame)
+                    ]
+                bank.append(bytes(v + flicker_range for rgb in frame for v in rgb))
+                prev = frame
+            self.bank = bank
+
+    def _list_range(self):
+        # Offsets are stored in a byte, so list mode noise is clamped to +-127
+        return max(0, min(127, self.flicker_range))
+
+    def next_frame(self, base_color):
+        """
+        Returns the next noise frame around base_color, clamped to 0 - 255.
+        """
+        if self.bank is None:
+            self.build()
+        k = self.index
+        self.index = (k + 1) % self.bank_size
+
+        if self.use_numpy:
+            frame = self.bank[k] + np.asarray(base_color, dtype=np.int16)
+            np.clip(frame, 0, 255, out=frame)
+            return frame.astype(np.uint8)
+
+        # Clamping is a bytes.translate per channel through a table built
+        # once per base color, so frames are clamped on the fly in C and
+        # nothing per frame is kept
+        luts = self._luts.get(base_color)
+        if luts is None:
+            if len(self._luts) >= self.MAX_CACHED_COLORS:
+                self._luts.clear()
+            offset = self._list_range()
+            luts = self._luts[base_color] = tuple(
+                bytes(max(0, min(255, base + v - offset)) for v in range(256))
+                for base in base_color
+            )
+
+        frame = self.bank[k]
+        r_lut, g_lut, b_lut = luts
+        return list(zip(frame[0::3].translate(r_lut), frame[1::3].translate(g_lut), frame[2::3].translate(b_lut)))
+
+
+class AnimationCache:
+    """
+    LRU cache of encoded SPI frame sequences with a memory cap.
+
+    Parameters:
+    - max_bytes: Total size of stored frames before the least recently used
+      sequences are evicted.
+    """
+
+    def __init__(self, max_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (frames, size)
+
+    def get(self, key):
+        """
+        Returns the cached frame list for key, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, frames):
+        """
+        Stores a frame list, evicting old entries to stay under max_bytes.
+        Sequences larger than max_bytes on their own are not stored.
+        """
+        size = sum(self.frame_size(frame) for frame in frames)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[1]
+        while self._entries and self.size + size > self.max_bytes:
+            self.size -= self._entries.popitem(last=False)[1][1]
+
+        self._entries[key] = (frames, size)
+        self.size += size
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    @staticmethod
+    def frame_size(frame):
+        """
+        Bytes in one frame. A MultiStrip frame is a tuple of per-strip frames.
+        """
+        if isinstance(frame, tuple):
+            return sum(len(part) for part in frame)
+        return len(frame)
+
+
 class Animations:
     
-    def __init__(self, led_strip, flicker_active):
+    def __init__(self, led_strip, flicker_active, cache=None):
         self.led_strip = led_strip
         self.num_leds = led_strip.num_leds
         self.flicker_active = flicker_active
+        self.cache = cache if cache is not None else AnimationCache()
+        self._flicker_noise = None
+        self.last_timing = None
 
     # Delegate LED functions to DotStar instance
     def set_pixel_color(self, n, r, g, b):
@@ -76,7 +270,7 @@ class Animations:
     def fill(self, r, g, b):
         self.led_strip.fill(r, g, b)
     
-    def light_up(self, base_color=lambda: (255, 147, 41), speed=2.0):
+    def light_up(self, base_color=lambda: (255, 147, 41), speed=2.0, duration=None):
         
         
         """
@@ -84,43 +278,38 @@ class Animations:
     
         Parameters:
         - base_color_func: Function that returns an (R, G, B) tuple for the baseline color.
-        - speed: The speed of the animation (delay between each step).
+        - speed: The speed of the animation (time between each step).
+        - duration: Total time of the animation, overrides speed if given.
         """
-        r_base, g_base, b_base = base_color()
+        color = self._check_color(base_color())
+        period = self._step_period("light_up", speed, duration)
+        frames = self._get_frames("light_up", color)
+        self._play_frames(frames, period)
 
-        # Set up two pointers: one starting at the first LED and one at the last LED
-        start = 0
-        end = self.num_leds - 1
-
-        # Continue lighting up LEDs until the two pointers meet in the middle
-        while start <= end:
-            # Turn on LEDs at both the start and end pointers
-            self.set_pixel_color(start, r_base, g_base, b_base)
-            self.set_pixel_color(end, r_base, g_base, b_base)
-           
-            # Update the LEDs and move towards the center
-            self.show()
-            time.sleep(speed)
-
-            # Move the pointers towards the center
-            start += 1
-            end -= 1
+        # Leave the pixel state matching the last frame sent
+        self.led_strip.fill(*color, show=False)
             
+    def get_flicker_noise(self, flicker_range=30):
+        """
+        Returns the (cached) FlickerNoise bank for this strip and range.
+        """
+        noise = self._flicker_noise
+        if noise is None or noise.flicker_range != flicker_range:
+            use_numpy = getattr(self.led_strip, "use_numpy", False)
+            noise = self._flicker_noise = FlickerNoise(self.num_leds, flicker_range, use_numpy=use_numpy)
+        return noise
+
     def flicker(self, base_color=lambda: (255, 147, 41), flicker_range=30, speed=0.05, is_active_func=lambda: False):
         self.flicker_active[0] = True  # Signal flicker is starting
+        noise = self.get_flicker_noise(flicker_range)
 
         try:
+            # One active check, one noise frame and one show per frame
             while is_active_func():
-                r_base, g_base, b_base = base_color()
-                for i in range(self.num_leds):
-                    if not is_active_func():  # Check again mid-loop for faster stop
-                        break
-                    r = max(0, min(255, r_base + random.randint(-flicker_range, flicker_range)))
-                    g = max(0, min(255, g_base + random.randint(-flicker_range, flicker_range)))
-                    b = max(0, min(255, b_base + random.randint(-flicker_range, flicker_range)))
-                    self.set_pixel_color(i, r, g, b)
+                self.led_strip.set_pixels(noise.next_frame(tuple(base_color())))
                 self.show()
-                time.sleep(speed)
+                if speed > 0:
+                    time.sleep(speed)
         finally:
             self.flicker_active[0] = False  # Reset flicker flag when done
         
@@ -150,25 +339,110 @@ class Animations:
         self.fill(r_base, g_base, b_base)
 
     
-    def light_down(self, base_color=lambda: (255, 147, 41), speed=2.0):
+    def light_down(self, base_color=lambda: (255, 147, 41), speed=2.0, duration=None):
         """
         Powers down the LEDs starting from the middle LED and turning off LEDs towards both ends.
     
         Parameters:
         - base_color_func: Function that returns an (R, G, B) tuple for the baseline color.
-        - speed: The speed of the animation (delay between each step).
+        - speed: The speed of the animation (time between each step).
+        - duration: Total time of the animation, overrides speed if given.
         """
-        r_base, g_base, b_base = base_color()
+        color = self._check_color(base_color())
+        period = self._step_period("light_down", speed, duration)
+        frames = self._get_frames("light_down", color)
+        self._play_frames(frames, period)
+
+        # Leave the pixel state matching the last frame sent
+        self.led_strip.fill(0, 0, 0, show=False)
+
+    @staticmethod
+    def _check_color(color):
+        # Validated before anything is written to the strip
+        color = tuple(color)
+        if len(color) != 3:
+            raise ValueError("base_color must return an (R, G, B) tuple")
+        return color
+
+    def _step_period(self, effect, speed, duration):
+        """
+        Returns the time per step of light_up / light_down. duration spreads
+        the steps over that time; 0 or less sends the frames back to back.
+        """
+        if effect == "light_up":
+            steps = (self.num_leds + 1) // 2
+        else:
+            steps = self.num_leds // 2 + 1
+        return duration / max(1, steps) if duration else speed
+
+    def _encoding(self):
+        # Everything besides the pixels that changes the encoded bytes, for
+        # each physical strip (a MultiStrip has several)
+        strips = getattr(self.led_strip, "strips", (self.led_strip,))
+        return tuple(
+            (strip.brightness, strip.gamma, tuple(strip.color_balance), strip.global_brightness)
+            for strip in strips
+        )
+
+    def _get_frames(self, effect, color):
+        """
+        Returns the encoded frames (one per step) of light_up / light_down in
+        color, from the cache or by encoding them once.
+        """
+        key = (effect, color, self.num_leds, self._encoding())
+        frames = self.cache.get(key)
+        if frames is not None:
+            return frames
+
+        strip = self.led_strip
+        n = self.num_leds
+        frames = []
+        if effect == "light_up":
+            # Light one LED from each end per step until they meet in the middle
+            strip.fill(0, 0, 0, show=False)
+            for lit in range(1, (n + 1) // 2 + 1):
+                strip.set_pixel_color(lit - 1, *color)
+                strip.set_pixel_color(n - lit, *color)
+                frames.append(strip.frame_bytes())
+        else:
+            # Turn off one LED each side per step, moving outwards from the middle
+            middle = n // 2  # Always works for odd numbers
+            strip.fill(*color, show=False)
+            for i in range(middle + 1):
+                strip.set_pixel_color(middle - i, 0, 0, 0)
+                strip.set_pixel_color(middle + i, 0, 0, 0)
+                frames.append(strip.frame_bytes())
+
+        self.cache.put(key, frames)
+        return frames
+
+    def _play_frames(self, frames, period):
+        """
+        Sends frames one step per period, jumping ahead to the frame that is
+        due when behind schedule. A period of 0 or less sends every frame
+        back to back.
+        """
+        steps = len(frames)
+        if period <= 0:
+            start = time.monotonic()
+            for frame in frames:
+                self.led_strip.show_frame(frame)
+            self.last_timing = {
+                "frames"            : steps,
+                "overruns"          : 0,
+                "skipped"           : 0,
+                "max_overrun"       : 0.0,
+                "mean_overrun"      : 0.0,
+                "elapsed"           : time.monotonic() - start,
+            }
+            return
 
-        # Set up pointer starting from the middle LED
-        middle = self.num_leds // 2  # Always works for odd numbers
+        scheduler = FrameScheduler(period)
+        shown = 0
 
-        # Continue powering down LEDs until we reach the ends of the strip
-        for i in range(middle + 1):
-            # Turn off LEDs at positions moving outwards from the middle
-            self.set_pixel_color(middle - i, 0, 0, 0)  # Turning off from the middle left
-            self.set_pixel_color(middle + i, 0, 0, 0)  # Turning off from the middle right
+        while shown < steps:
+            shown = min(steps, scheduler.step() + 1)
+            self.led_strip.show_frame(frames[shown - 1])
+            scheduler.wait()
 
-            # Update the LEDs and pause before the next step
-            self.show()
-            time.sleep(speed)
+        self.last_timing = scheduler.stats()
\ No newline at end of file
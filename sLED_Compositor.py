@@ -0,0 +1,246 @@
+"""
+--------------------------------------------------------------------------
+sLED Compositor Driver - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+"""
+
+# Import libraries
+import math
+import time
+import threading
+from sLED_Animations import FlickerNoise
+from frame_scheduler import FrameScheduler
+from latency_trace import tracer
+
+
+#-----------------------------------------------------------------------
+# Compositor
+#-----------------------------------------------------------------------
+
+"""
+This code contains the Compositor class for the light_saber project. The
+compositor is the only thread that touches the DotStar strip: every frame
+it builds the pixels from a stack of layers and sends them with exactly one
+show(). Other threads only post state changes, which are plain attribute
+assignments, so nothing on the render path takes a lock. The one exception
+is the mask: posting a mask and retiring a finished one share a small lock,
+taken once per mask change, so a mask posted just as the previous one ends
+is not overwritten.
+
+Layers (bottom to top):
+
+base color : solid blade color (set_base_color)
+
+flicker : noise around the base color while motion is detected (set_flicker)
+
+flash : full strip overlay for a short time on impact (flash)
+
+mask : ignition / retraction, hides LEDs that are not lit yet (ignite,
+retract). ignite and retract return a threading.Event that is set once the
+animation finished.
+
+While the blade is dark (mask off) the render thread sends one dark frame
+and then sleeps until ignite() or cleanup(), so an idle saber costs no
+wakeups.  While the blade is lit without flicker or a flash, every frame
+is the same and DotStar.show() elides it, so a steady blade costs no SPI
+transfers either.
+
+set_flicker and flash take an optional latency trace id; the frame that
+first reflects the change stamps it at "render" and ends it at "show". A
+trace replaced by a newer one before any frame rendered it ends at
+"superseded".
+
+"""
+
+MASK_OFF        = "off"         # Blade dark
+MASK_ON         = "on"          # Blade fully lit
+MASK_IGNITING   = "igniting"    # Lighting from both ends towards the middle
+MASK_RETRACTING = "retracting"  # Turning off from the middle towards the ends
+
+class Compositor(threading.Thread):
+    
+    def __init__(self, led_strip, fps=50, base_color=(255, 147, 41), flicker_range=30):
+        threading.Thread.__init__(self, daemon=True)
+
+        self.led_strip = led_strip
+        self.num_leds = led_strip.num_leds
+        self.fps = fps
+        self.frames = 0
+        self.stop_compositor = False
+        self.scheduler = FrameScheduler(1.0 / fps)  # Overrun counters via scheduler.stats()
+
+        # Layer state - each attribute is replaced as a whole by producers
+        self._base = tuple(base_color)
+        self._flicker = False
+        self._flash = (0.0, (255, 255, 255))            # (until, color)
+        self._mask = (MASK_OFF, 0.0, 0.0, None)         # (mode, start, duration, done event)
+        self._trace = None                              # Latency trace id of the last change
+        self._wake = threading.Event()                  # Set when the dark render loop must resume
+        self._mask_lock = threading.Lock()              # Serializes _set_mask / _finish_mask
+
+        use_numpy = getattr(led_strip, "use_numpy", False)
+        self._noise = FlickerNoise(self.num_leds, flicker_range, use_numpy=use_numpy)
+
+    # -----------------------------------------------------
+    # Producer API (safe to call from any thread)
+    # -----------------------------------------------------
+
+    def set_base_color(self, color):
+        self._base = tuple(color)
+
+    def set_flicker(self, active, trace_id=None):
+        self._flicker = bool(active)
+        self._post_trace(trace_id)
+
+    def flash(self, duration=0.1, color=(255, 255, 255), trace_id=None):
+        self._flash = (time.monotonic() + duration, tuple(color))
+        self._post_trace(trace_id)
+
+    def _post_trace(self, trace_id):
+        # Only one change is traced per frame: a pending trace that no frame
+        # rendered yet is ended as superseded instead of left open
+        if trace_id is None:
+            return
+        previous = self._trace
+        self._trace = trace_id
+        if previous is not None and previous != trace_id:
+            tracer.end(previous, "superseded")
+
+    def ignite(self, duration=0.5):
+        """
+        Starts the ignition animation. Returns an Event set when it finished.
+        """
+        return self._set_mask(MASK_IGNITING, duration)
+
+    def retract(self, duration=0.5):
+        """
+        Starts the retraction animation. Returns an Event set when it finished.
+        """
+        return self._set_mask(MASK_RETRACTING, duration)
+
+    def _set_mask(self, mode, duration):
+        done = threading.Event()
+        with self._mask_lock:
+            previous = self._mask
+            self._mask = (mode, time.monotonic(), duration, done)
+        if previous[3] is not None:
+            previous[3].set()  # Superseded, don't leave waiters hanging
+        self._wake.set()
+        return done
+
+    # -----------------------------------------------------
+    # Render thread
+    # -----------------------------------------------------
+
+    def run(self):
+        """ Render frames at the target fps until cleanup() is called """
+        # The noise bank is built here rather than in __init__, which runs
+        # on the startup path before the button is live
+        self._noise.build()
+        self.scheduler.start()
+
+        while not self.stop_compositor:
+            self.render_frame(time.monotonic())
+
+            if self._mask[0] == MASK_OFF:
+                # The dark frame is out - nothing changes until the next mask
+                self._wake.wait()
+                self._wake.clear()
+                self.scheduler.resync()  # Keeps the overrun counters
+                continue
+
+            self.scheduler.wait()  # Late frames are skipped, not burst out
+
+    def render_frame(self, now):
+        """
+        Composites all layers for time now and sends one frame to the strip.
+        """
+        strip = self.led_strip
+        base = self._base
+        trace = self._trace
+        if trace is not None:
+            self._trace = None
+            tracer.stamp(trace, "render", now)
+        flash_until, flash_color = self._flash
+        mask = self._mask
+        mode, start, duration, done = mask
+
+        if mode == MASK_OFF:
+            strip.fill(0, 0, 0, show=False)
+        else:
+            # Color layers
+            if now < flash_until:
+                strip.fill(*flash_color, show=False)
+            elif self._flicker:
+                strip.set_pixels(self._noise.next_frame(base))
+            else:
+                strip.fill(*base, show=False)
+
+            # Ignition / retraction mask
+            if mode != MASK_ON:
+                progress = min(1.0, (now - start) / duration) if duration > 0 else 1.0
+                self._apply_mask(mode, progress)
+
+                if progress >= 1.0:
+                    self._finish_mask(mask)
+
+        strip.show()
+        self.frames += 1
+
+        if trace is not None:
+            tracer.end(trace, "show")
+
+    def _apply_mask(self, mode, progress):
+        # Blank the LEDs that are not lit at this point of the animation
+        n = self.num_leds
+        if mode == MASK_IGNITING:
+            lit = math.ceil(progress * ((n + 1) // 2))   # LEDs lit from each end
+            self.led_strip.set_range(lit, n - lit, 0, 0, 0)
+        else:
+            middle = n // 2
+            dark = math.ceil(progress * (middle + 1))    # LEDs dark each side of middle
+            self.led_strip.set_range(middle - dark + 1, middle + dark, 0, 0, 0)
+
+    def _finish_mask(self, mask):
+        # Only replace the mask if no producer posted a new one meanwhile
+        mode, start, duration, done = mask
+        with self._mask_lock:
+            if self._mask is mask:
+                self._mask = (MASK_ON if mode == MASK_IGNITING else MASK_OFF, 0.0, 0.0, None)
+        if done is not None:
+            done.set()
+
+    def cleanup(self):
+        """ Stop the render thread and wait for it to exit """
+        self.stop_compositor = True
+        self._wake.set()
+        if self.is_alive():
+            self.join()
@@ -33,9 +33,16 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 # Import libraries
-import spidev
+from hal import spidev
 import time
 import random
+from itertools import chain
+from spi_writer import SpiWriter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only needed for use_numpy=True
 
 #-----------------------------------------------------------------------
 # DotStar
@@ -49,54 +56,321 @@ set_pixel_color : Sets the color of one pixel
 
 clear : turns off all of sLED by setting colors to (0, 0, 0)
 
-show : handles communication with sLED via SPI, with start_frame + tuple +
-end_frame and uses a brightness multiplier
+show : handles communication with sLED via SPI, sending the preallocated
+frame buffer (start_frame + header/BGR per LED + end_frame) through a
+SpiWriter, which writes it without copies or read-back in chunks of at
+most the spidev bufsiz, so strips of any length work
+
+flush : show() with force=True to resend a frame that did not change
+
+Every change to the frame buffer bumps the generation counter. show() 
+skips the transfer when the generation is the one last sent, or when the
+buffer was rewritten with the same bytes as the last frame sent (e.g. 
+fill() with the color already on the strip), and counts it in 
+frames_elided (see stats()). show_frame marks the strip dirty, so the 
+next show() sends the buffer again if it differs from the replayed frame.
 
 fill : sets all LEDs to the same color
 
+frame_bytes : returns a copy of the encoded wire frame (for caching)
+
+show_frame : sends a previously encoded wire frame as is
+
 close : cleanup function for dotstar -> closes SSPI connection
 
+speed_hz : SPI clock in use (set with set_speed, default 4 MHz; the
+driver may clamp it)
+
 base_color : sets up base color of sLED
 
+The wire frame is laid out once in __init__ as a bytearray:
+
+  [0x00 x 4] [0xFF, b, g, r] x num_leds [0xFF x ((num_leds + 15) // 16)]
+
+set_pixel_color and fill write the brightness scaled BGR bytes straight
+into that buffer, so show() only has to hand it to the SPI driver.
+
+set_brightness : changes brightness (also done by assigning .brightness)
+
+Brightness and gamma are applied through 256-entry lookup tables per
+channel that are only rebuilt when the brightness changes. With
+global_brightness=True the LUTs hold gamma only and brightness goes into
+the 5-bit APA102 header field instead, so dimming rewrites one header
+byte per LED and keeps the full 8-bit colour resolution.
+
+set_range : sets a run of LEDs to the same color
+
+set_pixels : copies a sequence / (N, 3) array of RGB values onto the strip
+
+scale : scales every pixel by a factor (e.g. fading)
+
+blend : mixes the strip with another color or pixel array
+
+With use_numpy=True the pixels are kept in an (N, 3) uint8 NumPy array and
+the frame buffer is encoded with vectorized LUT lookups through a NumPy
+view of the bytearray, so none of the above loop over pixels in Python.
+Without NumPy the same calls work on the list of RGB tuples, and ranges
+are encoded a channel at a time with bytes.translate through the LUTs and
+strided writes into the frame buffer, so there is no per-LED Python loop
+there either.
+
 """
+
+START_FRAME_LEN = 4     # 32 bits of 0x00 start the frame
+LED_HEADER      = 0xFF  # 0b111 + 5-bit global brightness (full)
+HEADER_BITS     = 0xE0  # 0b111 marker bits of the per-LED header
+MAX_GLOBAL      = 31    # Largest value of the 5-bit global brightness field
+BYTES_PER_LED   = 4     # header, blue, green, red
+
 class DotStar:
     
-    def __init__(self, num_leds, brightness=1.0):
+    def __init__(self, num_leds, brightness=1.0, gamma=1.0, color_balance=(1.0, 1.0, 1.0),
+                 global_brightness=False, use_numpy=False, bus=0, device=0, speed_hz=4000000):
+        if use_numpy and np is None:
+            raise ImportError("numpy is required for DotStar(use_numpy=True)")
+
         self.num_leds = num_leds # number of LEDs on DotStar Strip
-        self.brightness = max(0.0, min(brightness, 1.0))  # Clamp between 0.0 and 1.0
-        self.pixels = [(0, 0, 0)] * num_leds  # RGB tuples
+        self.use_numpy = use_numpy
+        if use_numpy:
+            self.pixels = np.zeros((num_leds, 3), dtype=np.uint8)  # RGB rows
+        else:
+            self.pixels = [(0, 0, 0)] * num_leds  # RGB tuples
+        self.gamma = gamma
+        self.color_balance = color_balance  # Per channel (r, g, b) scale
+        self.global_brightness = global_brightness  # Dim via APA102 header bits
+
+        # Preallocated wire frame: start frame, one header + BGR per LED,
+        # and enough end frame bytes to clock data out to the last LED
+        end_frame_len = (num_leds + 15) // 16
+        self._frame = bytearray(START_FRAME_LEN + BYTES_PER_LED * num_leds + end_frame_len)
+        self._frame[START_FRAME_LEN:START_FRAME_LEN + BYTES_PER_LED * num_leds] = bytes((LED_HEADER, 0, 0, 0)) * num_leds
+        self._frame[START_FRAME_LEN + BYTES_PER_LED * num_leds:] = b"\xff" * end_frame_len
+        if use_numpy:
+            # (N, 4) view of the LED slots, writes go straight into _frame
+            self._leds = np.frombuffer(self._frame, dtype=np.uint8, count=BYTES_PER_LED * num_leds,
+                                       offset=START_FRAME_LEN).reshape(num_leds, BYTES_PER_LED)
+
+        # Dirty tracking: generation of the buffer vs. what is on the wire
+        self.generation = 0
+        self._sent_generation = None
+        # Copy of the last frame sent, preallocated so sending allocates
+        # nothing. All zeros never matches a frame (LED headers are 0b111xxxxx)
+        self._sent = bytearray(len(self._frame))
+        self.frames_sent = 0
+        self.frames_elided = 0
+
+        # Build the LUTs and header for the starting brightness
+        self._r_lut = self._g_lut = self._b_lut = None
+        self.set_brightness(brightness)
 
         # Initialize SPI1 on PocketBeagle
         self.spi = spidev.SpiDev()
-        self.spi.open(0, 0)  # bus 1, device 0 = SPI1 on PocketBeagle
-        self.spi.max_speed_hz = 4000000  # 4 MHz is a safe speed
+        self.spi.open(bus, device)  # bus 0, device 0 = SPI1 on PocketBeagle
         self.spi.mode = 0b00
+        self.writer = SpiWriter(self.spi, speed_hz)  # 4 MHz is a safe speed
+
+    @property
+    def speed_hz(self):
+        return self.writer.speed_hz
+
+    def set_speed(self, speed_hz):
+        # Returns the speed the SPI driver actually uses
+        return self.writer.set_speed(speed_hz)
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        self.set_brightness(brightness)
+
+    def set_brightness(self, brightness):
+        """
+        Sets the strip brightness (0.0 - 1.0) and rebuilds the lookup tables.
+        The frame buffer is updated, call show() to send it.
+        """
+        self._brightness = max(0.0, min(brightness, 1.0))  # Clamp between 0.0 and 1.0
+        start = START_FRAME_LEN
+        stop = START_FRAME_LEN + BYTES_PER_LED * self.num_leds
+
+        if self.global_brightness:
+            # LUTs only do gamma / colour balance (built once), dimming is
+            # done by the LEDs so only the header byte of each LED changes
+            if self._r_lut is None:
+                self._build_luts(1.0)
+            self._header = HEADER_BITS | int(self._brightness * MAX_GLOBAL + 0.5)
+            self._frame[start:stop:BYTES_PER_LED] = bytes((self._header,)) * self.num_leds
+            self.generation += 1
+        else:
+            self._header = LED_HEADER
+            self._build_luts(self._brightness)
+            self._encode_range(0, self.num_leds)
+
+    def _build_luts(self, scale):
+        # 256-entry table per channel: input value -> gamma corrected, scaled byte
+        gamma = self.gamma
+        self._r_lut, self._g_lut, self._b_lut = [
+            bytes(min(255, int(((v / 255.0) ** gamma) * 255.0 * scale * balance + 0.5)) for v in range(256))
+            for balance in self.color_balance
+        ]
+        if self.use_numpy:
+            self._np_luts = [np.frombuffer(lut, dtype=np.uint8) for lut in (self._r_lut, self._g_lut, self._b_lut)]
+
+    def _encode(self, r, g, b):
+        # Header + LUT mapped BGR bytes for one LED
+        return (self._header, self._b_lut[b], self._g_lut[g], self._r_lut[r])
+
+    def _encode_range(self, start, stop):
+        # Re-encode LEDs [start, stop) from self.pixels into the frame buffer
+        self.generation += 1
+        if self.use_numpy:
+            r_lut, g_lut, b_lut = self._np_luts
+            px = self.pixels[start:stop]
+            leds = self._leds[start:stop]
+            leds[:, 0] = self._header
+            leds[:, 1] = b_lut[px[:, 2]]
+            leds[:, 2] = g_lut[px[:, 1]]
+            leds[:, 3] = r_lut[px[:, 0]]
+        else:
+            # Flatten to r, g, b bytes and map each channel through its LUT
+            # with bytes.translate, then write it into every 4th frame byte
+            rgb = bytes(chain.from_iterable(self.pixels[start:stop]))
+            i = START_FRAME_LEN + BYTES_PER_LED * start
+            j = START_FRAME_LEN + BYTES_PER_LED * stop
+            frame = self._frame
+            frame[i:j:BYTES_PER_LED] = bytes((self._header,)) * (stop - start)
+            frame[i + 1:j:BYTES_PER_LED] = rgb[2::3].translate(self._b_lut)
+            frame[i + 2:j:BYTES_PER_LED] = rgb[1::3].translate(self._g_lut)
+            frame[i + 3:j:BYTES_PER_LED] = rgb[0::3].translate(self._r_lut)
 
     def set_pixel_color(self, n, r, g, b):
         if 0 <= n < self.num_leds:
             self.pixels[n] = (r, g, b)
+            i = START_FRAME_LEN + BYTES_PER_LED * n
+            self._frame[i:i + BYTES_PER_LED] = self._encode(r, g, b)
+            self.generation += 1
 
     def clear(self):
-        self.pixels = [(0, 0, 0)] * self.num_leds
-        self.show()
+        self.fill(0, 0, 0)
+
+    @property
+    def dirty(self):
+        # True when the buffer changed since the last frame sent
+        return self.generation != self._sent_generation
 
     def show(self):
-        start_frame = [0x00] * 4
-        end_frame = [0xFF] * ((self.num_leds + 15) // 16)
-
-        led_data = []
-        for r, g, b in self.pixels:
-            r = int(r * self.brightness)
-            g = int(g * self.brightness)
-            b = int(b * self.brightness)
-            led_data.extend([0xFF, b, g, r])  # DotStar expects BGR + header
-
-        self.spi.xfer2(start_frame + led_data + end_frame)
-
-    def fill(self, r, g, b):
-        for i in range(self.num_leds):
-            self.set_pixel_color(i, r, g, b)
-        self.show()
+        # Returns True when a frame was sent, False when it was elided
+        return self.flush()
+
+    def flush(self, force=False):
+        """
+        Sends the frame buffer unless it matches the last frame sent. 
+        force=True always sends (e.g. to resync a strip after a glitch).
+        """
+        if not force and (not self.dirty or self._frame == self._sent):
+            self._sent_generation = self.generation
+            self.frames_elided += 1
+            return False
+
+        # The writer takes the bytearray directly (buffer protocol), so
+        # nothing is copied into a Python list and nothing is read back
+        self.writer.write(self._frame)
+        self._sent[:] = self._frame
+        self._sent_generation = self.generation
+        self.frames_sent += 1
+        return True
+
+    def stats(self):
+        # Frame counters, elided frames never reach the SPI writer
+        return {
+            "generation"    : self.generation,
+            "frames_sent"   : self.frames_sent,
+            "frames_elided" : self.frames_elided,
+        }
+
+    def frame_bytes(self):
+        # Snapshot of the encoded frame, e.g. to replay later with show_frame
+        return bytes(self._frame)
+
+    def show_frame(self, frame):
+        # Send a frame from frame_bytes() without touching the pixel state.
+        # The wire no longer holds the buffer, so the strip is dirty again
+        self.writer.write(frame)
+        self._sent[:] = frame
+        self._sent_generation = None
+        self.frames_sent += 1
+
+    def fill(self, r, g, b, show=True):
+        self.set_range(0, self.num_leds, r, g, b)
+        if show:
+            self.show()
+
+    def set_range(self, start, stop, r, g, b):
+        """
+        Sets LEDs [start, stop) to one color (indices are clamped to the strip).
+        """
+        start = max(0, start)
+        stop = min(self.num_leds, stop)
+        if start >= stop:
+            return
+
+        if self.use_numpy:
+            self.pixels[start:stop] = (r, g, b)
+        else:
+            self.pixels[start:stop] = [(r, g, b)] * (stop - start)
+        i = START_FRAME_LEN + BYTES_PER_LED * start
+        self._frame[i:i + BYTES_PER_LED * (stop - start)] = bytes(self._encode(r, g, b)) * (stop - start)
+        self.generation += 1
+
+    def set_pixels(self, pixels, start=0):
+        """
+        Copies RGB values onto the strip starting at LED start. pixels may be
+        a list of (r, g, b) tuples or an (M, 3) array; extra values are dropped.
+        """
+        stop = min(self.num_leds, start + len(pixels))
+        if start >= stop:
+            return
+
+        if self.use_numpy:
+            self.pixels[start:stop] = np.asarray(pixels)[:stop - start]
+        else:
+            self.pixels[start:stop] = map(tuple, pixels[:stop - start])
+        self._encode_range(start, stop)
+
+    def scale(self, factor):
+        """
+        Scales every pixel by factor (clamped to 0 - 255), e.g. for fades.
+        """
+        if self.use_numpy:
+            scaled = self.pixels * float(factor)
+            np.clip(scaled, 0, 255, out=scaled)
+            self.pixels[:] = scaled
+        else:
+            self.pixels = [
+                (min(255, int(r * factor)), min(255, int(g * factor)), min(255, int(b * factor)))
+                for r, g, b in self.pixels
+            ]
+        self._encode_range(0, self.num_leds)
+
+    def blend(self, other, alpha):
+        """
+        Mixes the strip towards other by alpha (0.0 = unchanged, 1.0 = other).
+        other is an (r, g, b) tuple or a per-LED sequence / (N, 3) array.
+        """
+        alpha = max(0.0, min(alpha, 1.0))
+        if self.use_numpy:
+            mixed = self.pixels * (1.0 - alpha) + np.asarray(other, dtype=np.float64) * alpha
+            self.pixels[:] = mixed + 0.5
+        else:
+            if len(other) == 3 and not isinstance(other[0], (tuple, list)):
+                other = [tuple(other)] * self.num_leds
+            keep = 1.0 - alpha
+            self.pixels = [
+                (int(r * keep + ro * alpha + 0.5), int(g * keep + go * alpha + 0.5), int(b * keep + bo * alpha + 0.5))
+                for (r, g, b), (ro, go, bo) in zip(self.pixels, other)
+            ]
+        self._encode_range(0, self.num_leds)
 
     def close(self):
         self.spi.close()
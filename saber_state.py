@@ -0,0 +1,203 @@
+"""
+--------------------------------------------------------------------------
+Saber State - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Saber State
+
+  State machine for the blade, shared by the button, motion and interrupt
+threads:
+
+      OFF         -> IGNITING
+      IGNITING    -> IDLE, RETRACTING
+      IDLE        -> SWINGING, CLASHING, RETRACTING
+      SWINGING    -> IDLE, CLASHING, RETRACTING
+      CLASHING    -> IDLE, SWINGING, RETRACTING
+      RETRACTING  -> OFF
+
+  Transitions are atomic: transition() checks the current state against an
+optional set of expected states and changes it under one lock, so two 
+threads racing for the blade (e.g. a clash and the end of a swing) cannot 
+both win.  Threads that only care about some states block in wait_for() on a
+condition variable instead of polling, and are woken as soon as a matching
+transition happens.
+
+  Hooks are called as hook(old, new) for every transition, in the thread 
+that made it and while the state is still locked, so every hook sees the 
+transitions in order.  Hooks must be quick and must not wait for other 
+threads that change the state.
+
+Software API:
+
+  SaberState(state=OFF)
+    state
+      - Current state (read only)
+
+    transition(new, expected=None)
+      - Change to new if the current state is in expected (any state when
+        None) and the move is allowed; return the old state, or None if the
+        state was not as expected
+      - Raises ValueError for a move that is never allowed (e.g. OFF -> IDLE)
+
+    wait_for(states, timeout=None)
+      - Block until the state is one of states, return it (None on timeout)
+
+    is_on()
+      - True while the blade is lit (IDLE, SWINGING or CLASHING)
+
+    add_hook(hook) / remove_hook(hook)
+      - Call hook(old, new) on every transition
+
+    with saber_state:
+      - Hold the state steady (no transitions) for the body
+
+"""
+import threading
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+OFF               = "off"
+IGNITING          = "igniting"
+IDLE              = "idle"
+SWINGING          = "swinging"
+CLASHING          = "clashing"
+RETRACTING        = "retracting"
+
+BLADE_ON          = (IDLE, SWINGING, CLASHING)
+
+# Allowed moves from each state
+TRANSITIONS = {
+    OFF         : (IGNITING,),
+    IGNITING    : (IDLE, RETRACTING),
+    IDLE        : (SWINGING, CLASHING, RETRACTING),
+    SWINGING    : (IDLE, CLASHING, RETRACTING),
+    CLASHING    : (IDLE, SWINGING, RETRACTING),
+    RETRACTING  : (OFF,),
+}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class SaberState():
+    """ Saber State Machine Class """
+    
+    def __init__(self, state=OFF):
+        """ Initialize variables """
+        if state not in TRANSITIONS:
+            raise ValueError("Unknown saber state {0!r}".format(state))
+
+        # Re-entrant so hooks can read the state
+        self._condition  = threading.Condition(threading.RLock())
+        self._state      = state
+        self._hooks      = ()       # Replaced (never mutated) like SensorSampler subscribers
+        self.transitions = 0
+
+    # End def
+
+
+    @property
+    def state(self):
+        return self._state
+
+    # End def
+
+
+    def is_on(self):
+        """ True while the blade is lit """
+        return self._state in BLADE_ON
+
+    # End def
+
+
+    def transition(self, new, expected=None):
+        """ Atomically move to new, return the old state (None if not expected) """
+        with self._condition:
+            old = self._state
+            if expected is not None and old not in expected:
+                return None
+            if new not in TRANSITIONS[old]:
+                raise ValueError("Saber cannot go from {0} to {1}".format(old, new))
+
+            self._state       = new
+            self.transitions += 1
+            for hook in self._hooks:
+                hook(old, new)
+            self._condition.notify_all()
+
+        return old
+
+    # End def
+
+
+    def wait_for(self, states, timeout=None):
+        """ Block until the state is one of states, return it (None on timeout) """
+        with self._condition:
+            if self._condition.wait_for(lambda: self._state in states, timeout):
+                return self._state
+        return None
+
+    # End def
+
+
+    def __enter__(self):
+        self._condition.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._condition.release()
+
+    # End def
+
+
+    def add_hook(self, hook):
+        """ Call hook(old, new) on every transition """
+        with self._condition:
+            self._hooks = self._hooks + (hook,)
+
+    # End def
+
+
+    def remove_hook(self, hook):
+        with self._condition:
+            self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    # End def
+
+# End class
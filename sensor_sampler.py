@@ -0,0 +1,231 @@
+"""
+--------------------------------------------------------------------------
+Sensor Sampler - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Sensor Sampler
+
+  Background thread that owns the MPU6050 reads.  It samples the sensor at a
+fixed rate (using a FrameScheduler, so read time does not stretch the period)
+and publishes every reading as a (seq, timestamp, data) tuple, where seq 
+counts samples, timestamp is time.monotonic() at the read and data is the 
+dictionary from get_sensor_data().
+
+  When latency tracing is enabled each sample starts the trace ("imu", seq)
+at the "read" stage and stamps "sample" when it is published.
+
+  Readers that only need the newest value call latest(), which returns the
+last published tuple without taking a lock (the tuple is swapped in with one 
+assignment).  Readers that need every sample subscribe() and get their own 
+bounded queue; when a subscriber falls behind, its oldest samples are dropped
+so the sampler never blocks.
+
+Software API:
+
+  SensorSampler(sensor, rate_hz=20)
+    - Provide the sensor object (anything with get_sensor_data())
+    
+    start()
+      - Starts the sampler thread
+
+    latest()
+      - Return the newest (seq, timestamp, data) tuple (None before the
+        first sample)
+
+    subscribe(maxsize=64)
+      - Return a queue.Queue that receives every sample from now on
+
+    unsubscribe(subscription)
+      - Stop delivering samples to a queue
+
+    pause() / resume()
+      - Stop / restart reading the sensor (e.g. while the blade is off)
+      - After a resume the sampler thread calls the sensor's wait_ready()
+        (if it has one) before the next read, so the first samples after
+        the sensor leaves a low power mode are valid
+
+    cleanup()
+      - Stop the sampler thread
+
+"""
+import time
+import queue
+import threading
+
+from frame_scheduler import FrameScheduler
+from latency_trace import tracer
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class SensorSampler(threading.Thread):
+    """ Sensor Sampler Class """
+    sensor                        = None
+    rate_hz                       = None
+    stop_sampler                  = None
+    
+    def __init__(self, sensor, rate_hz=20):
+        """ Initialize variables """
+        threading.Thread.__init__(self, daemon=True)
+
+        self.sensor         = sensor
+        self.rate_hz        = rate_hz
+        self.stop_sampler   = False
+
+        self.samples        = 0
+        self.errors         = 0
+        self.dropped        = 0       # Samples dropped from full subscriber queues
+
+        self._latest        = None
+        self._subscribers   = ()      # Replaced (never mutated) so publish needs no lock
+        self._sub_lock      = threading.Lock()
+        self._running       = threading.Event()
+        self._running.set()
+    
+    # End def
+
+
+    def latest(self):
+        """ Return the newest (seq, timestamp, data) tuple """
+        return self._latest
+
+    # End def
+
+
+    def subscribe(self, maxsize=64):
+        """ Return a bounded queue that receives every new sample """
+        subscription = queue.Queue(maxsize)
+        with self._sub_lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    # End def
+
+
+    def unsubscribe(self, subscription):
+        """ Stop delivering samples to a queue """
+        with self._sub_lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    # End def
+
+
+    def pause(self):
+        """ Stop reading the sensor """
+        self._running.clear()
+
+    # End def
+
+
+    def resume(self):
+        """ Restart reading the sensor """
+        self._running.set()
+
+    # End def
+
+
+    def run(self):
+        """ Read and publish samples until cleanup() is called """
+        scheduler = FrameScheduler(1.0 / self.rate_hz)
+
+        while not self.stop_sampler:
+            if not self._running.is_set():
+                self._running.wait()
+                wait_ready = getattr(self.sensor, "wait_ready", None)
+                if wait_ready is not None:
+                    wait_ready()   # e.g. MPU6050 gyro start-up after full_power()
+                scheduler.start()  # Don't count the pause as overrun
+                continue
+
+            read_time = time.monotonic()
+            try:
+                data = self.sensor.get_sensor_data()
+            except OSError:
+                # Bus glitch - skip this sample, keep sampling
+                self.errors += 1
+                scheduler.wait()
+                continue
+
+            self.samples += 1
+            trace_id = ("imu", self.samples)
+            tracer.begin(trace_id, "read", read_time)
+            tracer.stamp(trace_id, "sample")
+            self._publish((self.samples, read_time, data))
+            scheduler.wait()
+
+    # End def
+
+
+    def _publish(self, sample):
+        """ Hand a sample to latest() and every subscriber """
+        self._latest = sample
+
+        for subscription in self._subscribers:
+            try:
+                subscription.put_nowait(sample)
+            except queue.Full:
+                # Drop the oldest sample to make room for the new one
+                try:
+                    subscription.get_nowait()
+                except queue.Empty:
+                    pass
+                self.dropped += 1
+                try:
+                    subscription.put_nowait(sample)
+                except queue.Full:
+                    pass
+
+    # End def
+
+
+    def cleanup(self):
+        """ Stop the sampler thread and wait for completion """
+        self.stop_sampler = True
+        self._running.set()
+        if self.is_alive():
+            self.join()
+
+    # End def
+
+# End class
@@ -0,0 +1,197 @@
+"""
+--------------------------------------------------------------------------
+SPI Writer - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+SPI Writer
+
+  Write-only transfer layer between the LED drivers and spidev.  Frames 
+are sent straight from a bytes-like buffer (bytes, bytearray, memoryview)
+without building a Python list and without reading anything back, and are
+split into chunks of at most the spidev "bufsiz" (4096 bytes by default, 
+which is only about 1,000 APA102 LEDs).  Each chunk is a memoryview slice of
+the frame, so splitting does not copy it either.  APA102 / DotStar strips 
+have no chip select, so the chunks simply continue the same bit stream.
+
+  bufsiz is read from /sys/module/spidev/parameters/bufsiz (or the 
+simulated device's bufsiz).  The SPI clock is configurable: set_speed() 
+asks the driver for a speed and reads back the speed it actually uses, 
+halving the request if the driver refuses it.
+
+  Transfers use spidev writebytes2() when it exists (py-spidev 3.4+) and 
+fall back to writebytes() with a list per chunk on older versions.
+
+Software API:
+
+  SpiWriter(spi, speed_hz=4000000, bufsiz=None)
+    - spi is an open spidev.SpiDev; bufsiz=None probes it
+
+    write(frame)
+      - Send a bytes-like frame in bufsiz chunks
+
+    set_speed(speed_hz)
+      - Request a clock speed, return the speed in use
+
+    wire_time(num_bytes)
+      - Seconds num_bytes take on the wire at the current speed
+
+    stats()
+      - Frames, chunks, bytes and seconds spent in transfers
+
+"""
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+BUFSIZ_PATH       = "/sys/module/spidev/parameters/bufsiz"
+DEFAULT_BUFSIZ    = 4096          # spidev default
+MIN_SPEED_HZ      = 100000        # Don't probe below 100 kHz
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def probe_bufsiz(spi=None):
+    """ Largest single spidev transfer in bytes """
+    try:
+        with open(BUFSIZ_PATH) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        pass
+    return getattr(spi, "bufsiz", DEFAULT_BUFSIZ)
+
+# End def
+
+
+class SpiWriter():
+    """ SPI Writer Class """
+    
+    def __init__(self, spi, speed_hz=4000000, bufsiz=None):
+        """ Initialize variables """
+        self.spi         = spi
+        self.bufsiz      = bufsiz or probe_bufsiz(spi)
+        self.speed_hz    = None
+
+        self.frames      = 0
+        self.chunks      = 0
+        self.bytes       = 0
+        self.seconds     = 0.0
+
+        if hasattr(spi, "writebytes2"):
+            self._send = spi.writebytes2
+        else:
+            self._send = self._send_list
+
+        self.set_speed(speed_hz)
+
+    # End def
+
+
+    def _send_list(self, chunk):
+        # Old spidev: writebytes() only takes a list (still write-only)
+        self.spi.writebytes(chunk.tolist())
+
+    # End def
+
+
+    def set_speed(self, speed_hz):
+        """ Request speed_hz, return the clock speed the driver uses """
+        requested = int(speed_hz)
+        while True:
+            try:
+                self.spi.max_speed_hz = requested
+                break
+            except (OSError, ValueError):
+                if requested // 2 < MIN_SPEED_HZ:
+                    raise
+                requested //= 2
+
+        # The driver may clamp the request to what the controller supports
+        self.speed_hz = self.spi.max_speed_hz or requested
+        return self.speed_hz
+
+    # End def
+
+
+    def wire_time(self, num_bytes):
+        """ Seconds num_bytes take on the wire """
+        return num_bytes * 8.0 / self.speed_hz
+
+    # End def
+
+
+    def write(self, frame):
+        """ Send a bytes-like frame in chunks of at most bufsiz bytes """
+        start  = time.perf_counter()
+        bufsiz = self.bufsiz
+        send   = self._send
+
+        with memoryview(frame) as view:
+            length = len(view)
+            if length <= bufsiz:
+                send(view)
+                chunks = 1
+            else:
+                chunks = 0
+                for offset in range(0, length, bufsiz):
+                    send(view[offset:offset + bufsiz])
+                    chunks += 1
+
+        self.frames  += 1
+        self.chunks  += chunks
+        self.bytes   += length
+        self.seconds += time.perf_counter() - start
+
+    # End def
+
+
+    def stats(self):
+        """ Return the transfer counters """
+        return {
+            "frames"            : self.frames,
+            "chunks"            : self.chunks,
+            "bytes"             : self.bytes,
+            "seconds"           : self.seconds,
+            "speed_hz"          : self.speed_hz,
+            "bufsiz"            : self.bufsiz,
+        }
+
+    # End def
+
+# End class
@@ -0,0 +1,179 @@
+"""
+--------------------------------------------------------------------------
+Startup - Lightsaber Project
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Hailey Adams
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Startup
+
+  Helpers for a fast boot-to-ready start.  Instead of sleeping a fixed time
+until the kernel has created the device nodes, wait_for_paths() returns as 
+soon as they exist.  StartupTimer records how long each startup phase took,
+measured from the start of the Python process (so interpreter start up and
+imports are included), and phases running in different threads can overlap.
+
+Software API:
+
+  wait_for_paths(paths, timeout=DEVICE_TIMEOUT, poll_interval=0.01)
+    - Wait until every path exists, return the list still missing at the
+      timeout (empty when all are present)
+
+  process_age()
+    - Seconds since this process started (0.0 when /proc is unavailable)
+
+  StartupTimer()
+    phase(name)
+      - Context manager that times a phase (thread safe)
+
+    run(name, function, *args)
+      - Call function(*args) inside phase(name) (e.g. from a thread pool)
+
+    mark(name)
+      - Record a point in time (e.g. "button live")
+
+    report()
+      - Return the phases and marks as text, in order of start time
+
+"""
+import os
+import time
+import threading
+import contextlib
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DEVICE_TIMEOUT    = 30.0          # Seconds to wait for device nodes
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def wait_for_paths(paths, timeout=DEVICE_TIMEOUT, poll_interval=0.01):
+    """ Wait until all paths exist, return the ones still missing """
+    deadline = time.monotonic() + timeout
+    missing  = [path for path in paths if not os.path.exists(path)]
+
+    while missing and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        missing = [path for path in missing if not os.path.exists(path)]
+
+    return missing
+
+# End def
+
+
+def process_age():
+    """ Seconds since this process started """
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (starttime, clock ticks after boot); comm may hold spaces
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+# End def
+
+
+class StartupTimer():
+    """ Startup Phase Timer Class """
+    
+    def __init__(self):
+        """ Time zero is the start of the process """
+        self.origin  = time.monotonic() - process_age()
+        self.phases  = []         # (name, start, end) in seconds from origin
+        self.lock    = threading.Lock()
+
+    # End def
+
+
+    def now(self):
+        """ Seconds since the process started """
+        return time.monotonic() - self.origin
+
+    # End def
+
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ Time the body of a with statement """
+        start = self.now()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases.append((name, start, self.now()))
+
+    # End def
+
+
+    def run(self, name, function, *args):
+        """ Call function(*args) as a timed phase """
+        with self.phase(name):
+            return function(*args)
+
+    # End def
+
+
+    def mark(self, name):
+        """ Record a point in time """
+        t = self.now()
+        with self.lock:
+            self.phases.append((name, t, t))
+
+    # End def
+
+
+    def report(self):
+        """ Return the timings as text """
+        lines = ["Startup timings (s from process start):"]
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        for name, start, end in phases:
+            if start == end:
+                lines.append("  {0:6.3f}           {1}".format(start, name))
+            else:
+                lines.append("  {0:6.3f} - {1:6.3f}  {2} ({3:.3f} s)".format(start, end, name, end - start))
+        return "\n".join(lines)
+
+    # End def
+
+# End class
@@ -50,7 +50,7 @@ configuration, active_low=False.
   
 Software API:
 
-  ThreadedButton(pin, sleep_time=0.1, active_low=True)
+  ThreadedButton(pin, sleep_time=0.1, active_low=True, reactor=None)
     - Provide pin that the button monitors
     - The sleep_time is the time between calls to the callback functions
       while the button is waiting in either the pressed or unpressed state
@@ -60,9 +60,14 @@ Software API:
       input is "High"/"1" when the button is not pressed, and the 
       input is "Low" / "0" when the button is pressed).  If false, 
       the button has the opposite polarity.
+    - If an InputReactor is given, the button is watched by the reactor 
+      thread using edge events instead of running its own polling thread.
+      Press timing then comes from the edge timestamps.  The pressed and
+      unpressed callbacks are not executed in this mode.  If the pin cannot
+      be added to the reactor, the button falls back to polling.
     
     start()
-      - Starts the button thread
+      - Starts the button thread (or registers the button with the reactor)
     
     is_pressed()
       - Return a boolean value (i.e. True/False) on if button is pressed
@@ -97,7 +102,9 @@ Software API:
 import time
 import threading
 
-import Adafruit_BBIO.GPIO as GPIO
+from hal import GPIO
+
+from input_reactor import BUTTON_PRESS, BUTTON_RELEASE
 
 # ------------------------------------------------------------------------
 # Constants
@@ -126,6 +133,8 @@ class ThreadedButton(threading.Thread):
     sleep_time                    = None
     stop_button                   = None
     press_duration                = None
+    active_low                    = None
+    reactor                       = None
 
     pressed_callback              = None
     pressed_callback_value        = None
@@ -136,7 +145,7 @@ class ThreadedButton(threading.Thread):
     on_release_callback           = None
     on_release_callback_value     = None
     
-    def __init__(self, pin=None, sleep_time=0.1, active_low=True):
+    def __init__(self, pin=None, sleep_time=0.1, active_low=True, reactor=None):
         """ Initialize variables and set up the button """
         # Call parent class constructor
         threading.Thread.__init__(self)
@@ -160,6 +169,8 @@ class ThreadedButton(threading.Thread):
         self.sleep_time      = sleep_time
         self.stop_button     = False
         self.press_duration  = 0.0
+        self.active_low      = active_low
+        self.reactor         = reactor
 
         # All callback functions and values set to None if not used        
         
@@ -188,6 +199,36 @@ class ThreadedButton(threading.Thread):
     # End def
 
 
+    def start(self):
+        """ Start the button thread, or hand the pin to the reactor """
+        if self.reactor is not None:
+            try:
+                self.reactor.add_button(self.pin, self._reactor_event, 
+                                        active_low=self.active_low)
+                return
+            except (OSError, ValueError) as error:
+                print("Button {0}: reactor unavailable ({1}), polling".format(self.pin, error))
+                self.reactor = None
+        
+        threading.Thread.start(self)
+    
+    # End def
+
+
+    def _reactor_event(self, event, pin, timestamp, duration):
+        """ Translate reactor events into the button callbacks """
+        if event == BUTTON_PRESS:
+            if self.on_press_callback is not None:
+                self.on_press_callback_value = self.on_press_callback()
+        
+        elif event == BUTTON_RELEASE:
+            self.press_duration = duration
+            if self.on_release_callback is not None:
+                self.on_release_callback_value = self.on_release_callback()
+    
+    # End def
+
+
     def run(self):
         """ Run the button thread.  Execute callbacks as appropriate. """
         button_press_time     = None
@@ -250,7 +291,10 @@ class ThreadedButton(threading.Thread):
         # Nothing to do for GPIO; stop the thread and wait for completion
         
         self.stop_button = True
-        self.join()
+        if self.reactor is not None:
+            self.reactor.remove_button(self.pin)
+        else:
+            self.join()
         print("TBD - Stop the button thread") 
     
     # End def